@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Content-addressed store for assets/img with hardlink deduplication.
+
+Every file is hashed once (sha256, cached in .asset_store.json by size and
+mtime, so later runs only hash what changed). Files with the same hash are
+one blob whose canonical file is the shortest, then alphabetically first
+name. Two ways to deduplicate:
+
+    --link     replace every copy with a hardlink to the canonical file.
+               This saves local disk only: git, rsync without -H and CDN
+               uploads still store each path separately.
+    --rewrite  point the live pages' /assets/img/ references at the
+               canonical file and move duplicates that nothing references
+               any more to .quarantine/duplicates/, which shrinks the checkout,
+               rsync volume and CDN storage. Groups whose blob is not a
+               real image (e.g. one 404 page saved under many names) are
+               left alone.
+
+Near-duplicates are reported, not touched: responsive variants of the same
+image and width whose heights differ by a few pixels, e.g.
+msc-therapy-snhl-1024x502.webp and msc-therapy-snhl-1024x520.webp.
+
+Usage:
+    python3 asset_store.py            # report duplicates and near-duplicates
+    python3 asset_store.py --link     # hardlink identical files together
+    python3 asset_store.py --rewrite  # reference one copy and set the others aside
+"""
+import argparse
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+import image_headers
+import site_index
+
+ROOT_DIR = Path('/Users/asiboro/Sources/Work/23centuryid')
+IMG_DIR = 'assets/img'
+STORE_FILE = '.asset_store.json'
+QUARANTINE_DIR = '.quarantine/duplicates'
+REFERENCE_PREFIX = '/assets/img/'
+SCANNED_ASSET_DIRS = ['assets/css', 'assets/js']
+STORE_VERSION = 1
+CHUNK_SIZE = 64 * 1024
+NEAR_HEIGHT_RATIO = 0.05
+SIZED_NAME_PATTERN = re.compile(r'^(?P<base>.+)-(?P<width>\d+)x(?P<height>\d+)\.(?P<ext>[A-Za-z0-9]+)$')
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def load_store(root_dir=ROOT_DIR):
+    """Load the saved name -> {size, mtime, sha256} table, or an empty one."""
+    try:
+        with open(Path(root_dir) / STORE_FILE, 'r', encoding='utf-8') as f:
+            store = json.load(f)
+    except (OSError, ValueError):
+        store = None
+    if not store or store.get('version') != STORE_VERSION:
+        store = {'version': STORE_VERSION, 'files': {}}
+    return store
+
+
+def save_store(store, root_dir=ROOT_DIR):
+    store_path = Path(root_dir) / STORE_FILE
+    tmp_path = store_path.with_name(store_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(store, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, store_path)
+
+
+def scan(img_dir, store):
+    """Hash every file in img_dir, reusing cached hashes; return (name -> sha256, hashed)."""
+    cached = store['files']
+    files = {}
+    hashed = 0
+    for entry in sorted(os.scandir(img_dir), key=lambda e: e.name):
+        if not entry.is_file(follow_symlinks=False) or entry.name.startswith('.'):
+            continue
+        stat = entry.stat()
+        known = cached.get(entry.name)
+        if known and known['size'] == stat.st_size and known['mtime'] == stat.st_mtime_ns:
+            files[entry.name] = known['sha256']
+            continue
+        sha256 = file_sha256(entry.path)
+        cached[entry.name] = {'size': stat.st_size, 'mtime': stat.st_mtime_ns, 'sha256': sha256}
+        files[entry.name] = sha256
+        hashed += 1
+    for name in set(cached) - set(files):
+        del cached[name]
+    return files, hashed
+
+
+def duplicate_groups(files):
+    """sha256 -> sorted names for every blob stored under more than one name."""
+    blobs = {}
+    for name, sha256 in files.items():
+        blobs.setdefault(sha256, []).append(name)
+    return {sha256: sorted(names, key=lambda n: (len(n), n))
+            for sha256, names in blobs.items() if len(names) > 1}
+
+
+def hardlink(canonical, duplicate):
+    """Replace duplicate with a hardlink to canonical; True if they now share an inode."""
+    if os.path.samefile(canonical, duplicate):
+        return True
+    tmp_path = duplicate + '.link'
+    try:
+        os.link(canonical, tmp_path)
+    except OSError:
+        return False
+    os.replace(tmp_path, duplicate)
+    return True
+
+
+def canonical_names(img_dir, groups):
+    """duplicate -> canonical name for the groups whose blob is the image its canonical name says."""
+    renames = {}
+    for names in groups.values():
+        canonical = names[0]
+        info = image_headers.sniff(Path(img_dir) / canonical)
+        if info.format != image_headers.EXTENSION_FORMATS.get(Path(canonical).suffix.lower()):
+            continue
+        for name in names[1:]:
+            renames[name] = canonical
+    return renames
+
+
+def reference_pattern(renames):
+    """Regex matching /assets/img/<duplicate> as a whole path."""
+    names = '|'.join(re.escape(name) for name in sorted(renames, key=len, reverse=True))
+    return re.compile(re.escape(REFERENCE_PREFIX) + f'({names})' + r'(?=["\'\s,)?#&]|$)')
+
+
+def rewrite_references(content, renames, pattern=None):
+    """Point references to duplicates at their canonical file; return (new_content, replacements)."""
+    if not renames or REFERENCE_PREFIX not in content:
+        return content, 0
+    pattern = pattern or reference_pattern(renames)
+    return pattern.subn(lambda match: REFERENCE_PREFIX + renames[match.group(1)], content)
+
+
+def referenced_names(root_dir, names, index):
+    """The names still mentioned by any page (fetched copies included) or CSS/JS asset."""
+    paths = [Path(root_dir) / rel_path for rel_path, _ in site_index.iter_pages(index)]
+    for rel_dir in SCANNED_ASSET_DIRS:
+        asset_dir = Path(root_dir) / rel_dir
+        if asset_dir.is_dir():
+            paths.extend(Path(entry.path) for entry in os.scandir(asset_dir) if entry.is_file())
+    remaining = set(names)
+    found = set()
+    for path in paths:
+        try:
+            with open(path, 'r', encoding='utf-8', errors='ignore') as f:
+                content = f.read()
+        except OSError:
+            continue
+        hits = {name for name in remaining if name in content}
+        found |= hits
+        remaining -= hits
+        if not remaining:
+            break
+    return found
+
+
+def rewrite_site(root_dir, img_dir, renames):
+    """Rewrite the live pages to the canonical names and quarantine unreferenced duplicates.
+
+    Returns (pages rewritten, references rewritten, names moved).
+    """
+    pattern = reference_pattern(renames)
+    index = site_index.load_index(root_dir)
+    pages = site_index.pages_containing(index, [REFERENCE_PREFIX + name for name in renames],
+                                        root_dir, include_fetched=False)
+    pages_rewritten = references = 0
+    for rel_path in pages:
+        path = Path(root_dir) / rel_path
+        with open(path, 'r', encoding='utf-8') as f:
+            content = f.read()
+        content, count = rewrite_references(content, renames, pattern)
+        if count:
+            tmp_path = path.with_name(path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+            pages_rewritten += 1
+            references += count
+
+    index = site_index.load_index(root_dir)
+    still_used = referenced_names(root_dir, renames, index)
+    quarantine_dir = Path(root_dir) / QUARANTINE_DIR
+    moved = []
+    blocked = []
+    for name in sorted(set(renames) - still_used):
+        if (quarantine_dir / name).exists():
+            # Never overwrite a file quarantined by an earlier run
+            blocked.append(name)
+            continue
+        os.makedirs(quarantine_dir, exist_ok=True)
+        os.replace(Path(img_dir) / name, quarantine_dir / name)
+        moved.append(name)
+    return pages_rewritten, references, moved, blocked
+
+
+def near_duplicates(files, ratio=NEAR_HEIGHT_RATIO):
+    """Pairs of distinct -WxH variants of one image and width whose heights are within ratio."""
+    sized = {}
+    for name in files:
+        match = SIZED_NAME_PATTERN.match(name)
+        if match:
+            key = (match.group('base'), int(match.group('width')))
+            sized.setdefault(key, []).append((int(match.group('height')), name))
+    pairs = []
+    for (_, width), variants in sorted(sized.items()):
+        variants.sort()
+        for (height_a, name_a), (height_b, name_b) in zip(variants, variants[1:]):
+            if files[name_a] != files[name_b] and height_b - height_a <= height_b * ratio:
+                pairs.append((name_a, name_b))
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Deduplicate assets/img by content hash.')
+    parser.add_argument('--link', action='store_true',
+                        help='hardlink identical files to one canonical copy (local disk only)')
+    parser.add_argument('--rewrite', action='store_true',
+                        help=f'reference the canonical copy in the live pages and move unreferenced '
+                             f'duplicates to {QUARANTINE_DIR}')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("ASSET STORE")
+    print("=" * 80)
+
+    img_dir = ROOT_DIR / IMG_DIR
+    store = load_store(ROOT_DIR)
+    files, hashed = scan(img_dir, store)
+    print(f"{len(files)} files, {hashed} hashed, {len(files) - hashed} from cache")
+
+    groups = duplicate_groups(files)
+    size_of = {name: entry['size'] for name, entry in store['files'].items()}
+    wasted = sum(size_of[names[0]] * (len(names) - 1) for names in groups.values())
+    print(f"\nIdentical files: {sum(len(n) - 1 for n in groups.values())} duplicates "
+          f"in {len(groups)} groups, {wasted:,} bytes\n")
+
+    linked = saved = 0
+    for sha256, names in sorted(groups.items(), key=lambda item: item[1][0]):
+        canonical = names[0]
+        print(f"  {canonical} ({sha256[:12]})")
+        for name in names[1:]:
+            canonical_path, path = str(img_dir / canonical), str(img_dir / name)
+            if os.path.samefile(canonical_path, path):
+                print(f"    = {name} (already hardlinked)")
+            elif args.link and hardlink(canonical_path, path):
+                linked += 1
+                saved += size_of[name]
+                print(f"    = {name} (hardlinked)")
+            else:
+                print(f"    = {name}")
+        # A hardlinked copy keeps the canonical mtime; record it so the cache stays warm
+        for name in names[1:]:
+            stat = os.stat(img_dir / name)
+            store['files'][name]['mtime'] = stat.st_mtime_ns
+
+    if args.rewrite:
+        renames = canonical_names(img_dir, groups)
+        pages_rewritten, references, moved, blocked = rewrite_site(ROOT_DIR, img_dir, renames)
+        for name in moved:
+            del store['files'][name]
+        print(f"\nRewrote {references} references in {pages_rewritten} pages to the canonical copy")
+        print(f"Moved {len(moved)} unreferenced duplicates to {ROOT_DIR / QUARANTINE_DIR}, "
+              f"{sum(size_of[name] for name in moved):,} bytes")
+        for name in blocked:
+            print(f"  kept {name} ({QUARANTINE_DIR}/{name} already exists)")
+        for name in sorted(set(renames) - set(moved) - set(blocked)):
+            print(f"  kept {name} (still referenced)")
+    save_store(store, ROOT_DIR)
+
+    pairs = near_duplicates(files)
+    print(f"\nNear-duplicates: {len(pairs)} pairs")
+    for name_a, name_b in pairs:
+        print(f"  ~ {name_a}  {name_b}")
+
+    print(f"\n{'-' * 80}")
+    if args.link:
+        print(f"Hardlinked {linked} new duplicates, {saved:,} bytes of local disk saved")
+        print("Git, rsync without -H and uploads still store every path; use --rewrite to deduplicate those")
+    elif not args.rewrite:
+        print("Run with --link to hardlink identical files (local disk), or --rewrite to reference one copy")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
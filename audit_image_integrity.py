@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Check that every file in assets/img really is the image its name says.
+
+Each file's header is read (image_headers.sniff, no decoding) in a thread
+pool and classified:
+
+    empty     zero-byte file
+    html      an HTML page saved under an image name, e.g. a 404 body
+    text      other text, e.g. a data: URL or a note
+    unknown   binary data that is no known image format
+    mismatch  a real image under the wrong extension, e.g. PNG bytes in .webp
+    no-size   a raster image whose header carries no dimensions
+
+With --quarantine, files that are not images at all (empty, html, text,
+unknown) are moved to .quarantine/not-images/ in the site root so they stop being
+deployed; mismatches are only reported, as browsers still decode them.
+Exits with status 1 when anything is flagged, so it can be used as a gate.
+
+Usage:
+    python3 audit_image_integrity.py [--jobs 8] [--quarantine]
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple, Optional
+
+import image_headers
+
+ROOT_DIR = Path('/Users/asiboro/Sources/Work/23centuryid')
+ASSETS_IMG_DIR = ROOT_DIR / 'assets' / 'img'
+QUARANTINE_DIR = ROOT_DIR / '.quarantine' / 'not-images'
+JOBS = 8
+# Problems that mean the file is not an image at all
+QUARANTINE_PROBLEMS = ('empty', 'html', 'text', 'unknown')
+
+
+class FileAudit(NamedTuple):
+    name: str
+    info: image_headers.ImageInfo
+    problem: Optional[str]
+
+
+def audit_file(path):
+    """Sniff one file and name its problem, or None if it is what its extension says."""
+    path = Path(path)
+    info = image_headers.sniff(path)
+    expected = image_headers.EXTENSION_FORMATS.get(path.suffix.lower())
+    if info.format in image_headers.NON_IMAGE_FORMATS or info.format == 'unknown':
+        problem = info.format
+    elif expected and info.format != expected:
+        problem = 'mismatch'
+    elif info.format != 'svg' and (info.width is None or info.height is None):
+        problem = 'no-size'
+    else:
+        problem = None
+    return FileAudit(path.name, info, problem)
+
+
+def audit_directory(img_dir=ASSETS_IMG_DIR, jobs=JOBS):
+    """Audit every image file in img_dir in parallel; return FileAudits sorted by name."""
+    paths = sorted(entry.path for entry in os.scandir(img_dir)
+                   if entry.is_file() and Path(entry.name).suffix.lower() in image_headers.EXTENSION_FORMATS)
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        return list(pool.map(audit_file, paths))
+
+
+def quarantine(img_dir, audits, quarantine_dir=QUARANTINE_DIR):
+    """Move files that are not images into quarantine_dir; return (names moved, names blocked).
+
+    A file whose name is already taken in quarantine_dir, e.g. by an
+    earlier run, is left in place instead of overwriting it.
+    """
+    moved = []
+    blocked = []
+    for audit in audits:
+        if audit.problem in QUARANTINE_PROBLEMS:
+            target = Path(quarantine_dir) / audit.name
+            if target.exists():
+                blocked.append(audit.name)
+                continue
+            os.makedirs(quarantine_dir, exist_ok=True)
+            os.replace(Path(img_dir) / audit.name, target)
+            moved.append(audit.name)
+    return moved, blocked
+
+
+def describe(audit):
+    """One-line description of a flagged file."""
+    if audit.problem == 'mismatch':
+        return f"{audit.name}: {audit.info.format} data under a {Path(audit.name).suffix} name"
+    if audit.problem == 'no-size':
+        return f"{audit.name}: {audit.info.format} without readable dimensions"
+    return f"{audit.name}: {audit.problem}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check image files against their extensions.')
+    parser.add_argument('--jobs', type=int, default=JOBS, metavar='N',
+                        help='files read in parallel (default: %(default)s)')
+    parser.add_argument('--quarantine', action='store_true',
+                        help=f'move non-image files to {QUARANTINE_DIR}')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("IMAGE INTEGRITY AUDIT")
+    print("=" * 80)
+
+    audits = audit_directory(ASSETS_IMG_DIR, args.jobs)
+    flagged = [audit for audit in audits if audit.problem]
+    counts = {}
+    for audit in flagged:
+        counts[audit.problem] = counts.get(audit.problem, 0) + 1
+
+    print(f"\nChecked {len(audits)} files, {len(flagged)} flagged\n")
+    for audit in flagged:
+        print(f"  ✗ {describe(audit)}")
+
+    if args.quarantine and flagged:
+        moved, blocked = quarantine(ASSETS_IMG_DIR, flagged)
+        print(f"\nQuarantined {len(moved)} files in {QUARANTINE_DIR}")
+        for name in blocked:
+            print(f"  ⚠️  {name} left in place: {QUARANTINE_DIR / name} already exists")
+
+    print(f"\n{'-' * 80}")
+    print(', '.join(f"{problem}: {count}" for problem, count in sorted(counts.items())) or "All images OK")
+    print("=" * 80)
+    return flagged
+
+
+if __name__ == '__main__':
+    sys.exit(1 if main() else 0)
@@ -2,51 +2,43 @@
 """
 Audit all image references in HTML files and verify they exist.
 For missing images, prepare fetch commands from the original site.
+Use --jobs N to re-parse pages that changed since the last site index in N
+worker processes.
 """
 
-import os
+import argparse
 import re
 import subprocess
 from pathlib import Path
 from urllib.parse import urlparse, urljoin
 import json
 
+import fs_resolver
+import site_index
+
 # Configuration
 ROOT_DIR = Path('/Users/asiboro/Sources/Work/23centuryid')
 ASSETS_IMG_DIR = ROOT_DIR / 'assets' / 'img'
 ORIGIN_URL = 'https://23c.jp'
 
-# Patterns to find image references
-IMAGE_PATTERNS = [
-    r'src=["\']([^"\']*\.(?:svg|png|jpg|jpeg|webp|gif))["\']',
-    r'href=["\']([^"\']*\.(?:svg|png|jpg|jpeg|webp|gif))["\']',
-    r'data-[^=]*=["\']([^"\']*\.(?:svg|png|jpg|jpeg|webp|gif))["\']',
-]
+# Image references are src/href/data-* attribute values ending in an image extension
+IMAGE_URL_PATTERN = re.compile(r'\.(?:svg|png|jpg|jpeg|webp|gif)$', re.IGNORECASE)
 
-def get_all_html_files():
-    """Get all HTML files in the workspace."""
-    html_files = []
-    for root, dirs, files in os.walk(ROOT_DIR):
-        # Skip fetched_pages, as those are archived
-        if 'fetched_pages' in root:
-            continue
-        for file in files:
-            if file.endswith('.html'):
-                html_files.append(Path(root) / file)
-    return sorted(html_files)
+def is_image_reference(attr, url):
+    """Check whether an attribute value is an image reference."""
+    return (attr in ('src', 'href') or attr.startswith('data-')) and bool(IMAGE_URL_PATTERN.search(url))
 
-def extract_image_references(html_file):
-    """Extract all image references from an HTML file."""
-    references = set()
-    try:
-        with open(html_file, 'r', encoding='utf-8') as f:
-            content = f.read()
-            for pattern in IMAGE_PATTERNS:
-                matches = re.findall(pattern, content, re.IGNORECASE)
-                references.update(matches)
-    except Exception as e:
-        print(f"Error reading {html_file}: {e}")
-    return references
+def collect_image_references(index):
+    """Map every image reference in the site index to the pages using it."""
+    all_references = {}
+    for rel_path, entry in site_index.iter_pages(index, include_fetched=False):
+        references = set()
+        for ref in entry['refs']:
+            if is_image_reference(ref['attr'], ref['url']):
+                references.add(ref['url'])
+        for ref in references:
+            all_references.setdefault(ref, []).append(rel_path)
+    return all_references
 
 def normalize_path(path):
     """Normalize image path to local path."""
@@ -68,7 +60,15 @@ def check_image_exists(img_path):
     else:
         return None  # Can't determine local path
     
-    return local_path if local_path.exists() else None
+    return local_path if fs_resolver.snapshot(ROOT_DIR).is_file(normalized) else None
+
+def inspect_reference(img_ref):
+    """Resolve one reference to (normalized, local_path, size); local_path is None if missing."""
+    normalized = normalize_path(img_ref)
+    local_file = check_image_exists(normalized)
+    if local_file:
+        return normalized, str(local_file), fs_resolver.snapshot(ROOT_DIR).size(normalized)
+    return normalized, None, None
 
 def get_fetch_command(img_path, filename):
     """Generate fetch command for missing image."""
@@ -90,43 +90,39 @@ def get_fetch_command(img_path, filename):
     return None
 
 def main():
+    parser = argparse.ArgumentParser(description='Audit image references in HTML files.')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help='worker processes for re-parsing changed pages (default: 1)')
+    args = parser.parse_args()
+    
     print("=" * 80)
     print("IMAGE REFERENCE AUDIT")
     print("=" * 80)
     
-    html_files = get_all_html_files()
+    index = site_index.load_index(ROOT_DIR, args.jobs)
+    html_files = [rel_path for rel_path, _ in site_index.iter_pages(index, include_fetched=False)]
     print(f"\nScanning {len(html_files)} HTML files...")
     
-    all_references = {}
     missing_images = {}
     existing_images = {}
     
     # Collect all image references
-    for html_file in html_files:
-        references = extract_image_references(html_file)
-        for ref in references:
-            if ref not in all_references:
-                all_references[ref] = []
-            all_references[ref].append(str(html_file.relative_to(ROOT_DIR)))
+    all_references = collect_image_references(index)
     
     print(f"\nFound {len(all_references)} unique image references\n")
     
+    # Only check /assets/img references (ignore CDN, external URLs)
+    img_refs = [ref for ref in sorted(all_references) if normalize_path(ref).startswith('/assets/')]
+    
     # Check which exist and which don't
-    for img_ref in sorted(all_references.keys()):
-        normalized = normalize_path(img_ref)
-        
-        # Only check /assets/img references (ignore CDN, external URLs)
-        if not normalized.startswith('/assets/'):
-            continue
-            
-        local_file = check_image_exists(normalized)
-        
+    for img_ref in img_refs:
+        normalized, local_file, size = inspect_reference(img_ref)
         if local_file:
             existing_images[img_ref] = {
                 'path': normalized,
                 'files': len(all_references[img_ref]),
-                'local_path': str(local_file),
-                'size': local_file.stat().st_size
+                'local_path': local_file,
+                'size': size
             }
         else:
             missing_images[img_ref] = {
@@ -0,0 +1,242 @@
+#!/usr/bin/env python3
+"""
+Benchmark the scan and rewrite scripts on synthetic sites.
+
+Synthetic sites are generated from the real page template in
+create_all_pages.create_treatment_page, with a body carrying the same kinds
+of WordPress paths the fixers rewrite (uploads, srcset, absolute URLs, theme
+CSS/JS, jQuery, fragment links). Each case runs in a fresh process and
+reports pages/s, MB/s and peak RSS.
+
+Usage:
+    python3 benchmark.py --sizes 1000,10000,100000
+    python3 benchmark.py --save-baseline          # store results as the baseline
+    python3 benchmark.py                          # compare against the baseline
+
+Any case slower (or heavier) than the baseline by more than --tolerance is
+reported as a REGRESSION and the script exits with status 1.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).resolve().parent
+BASELINE_FILE = ROOT_DIR / 'benchmark_baseline.json'
+DEFAULT_SIZES = [1000, 10000, 100000]
+# Caches the cases write into the site root; removed before every case
+CACHE_FILES = ['.asset_store.json', '.image_dimensions.json']
+
+SLUGS = [
+    'msc-therapy-alzheimers', 'msc-therapy-amd', 'msc-therapy-asd', 'msc-therapy-blindness',
+    'msc-therapy-chronic-pain', 'msc-therapy-diabetes', 'msc-therapy-liver-cirrhosis',
+    'msc-therapy-osteoarthritis', 'msc-therapy-parkinsons-disease', 'msc-therapy-renal-failure',
+]
+
+# Body with the WordPress-path density of a fetched treatment page
+PAGE_BODY = """<figure class="wp-block-image size-large"><img decoding="async" width="1024" height="683" src="/wp-content/uploads/2025/04/{slug}-1024x683.webp" alt="" srcset="/wp-content/uploads/2025/04/{slug}-1024x683.webp 1024w, /wp-content/uploads/2025/04/{slug}-300x200.webp 300w, /wp-content/uploads/2025/04/{slug}-768x512.webp 768w, /wp-content/uploads/2025/04/{slug}.webp 1200w" sizes="(max-width: 1024px) 100vw, 1024px"></figure>
+<p>Terapi sel punca mesenkimal (MSC) untuk {slug} sedang diteliti di berbagai pusat penelitian. <a href="/faq/#faq-0{n}">Lihat FAQ</a> atau <a href="/treatable/{other}/">kondisi lain</a>.</p>
+<img src="https://23c.jp/wp-content/uploads/2025/03/about.webp" alt="">
+<img src="/wp-content/themes/_23c/img/top/reason_img_00{n}.webp" alt="">
+<img src="/wp-content/uploads/2025/04/msc-treatment-rheumatoid-arthritis-1.webp" alt="">
+<link rel="stylesheet" href="/wp-content/themes/_23c/style.css">
+<script src="/wp-includes/js/jquery/jquery.min.js?ver=3.7.1"></script>
+<p>Referensi: <a href="https://pubmed.ncbi.nlm.nih.gov/39820591/#:~:text=therapeutic">PubMed</a>, <a href="#ref{n}">[{n}]</a></p>
+<ol><li id="ref{n}">Catatan kaki {n}</li></ol>
+"""
+
+
+def generate_site(root_dir, pages):
+    """Generate a synthetic site with `pages` treatment pages (skips existing pages)."""
+    import create_all_pages
+
+    root_dir = Path(root_dir)
+    for rel_path in ['assets/css/style.css', 'assets/css/main.css', 'assets/js/main.js',
+                     'assets/img/logo_black_001.svg', 'assets/img/logo_white_001.svg']:
+        path = root_dir / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.touch()
+    faq = root_dir / 'faq' / 'index.html'
+    if not faq.exists():
+        faq.parent.mkdir(parents=True, exist_ok=True)
+        faq.write_text(''.join(f'<h3 id="faq-0{n}">FAQ {n}</h3>\n' for n in range(1, 7)))
+
+    for i in range(pages):
+        page = root_dir / 'treatable' / f'synthetic-{i:06d}' / 'index.html'
+        if page.exists():
+            continue
+        slug = SLUGS[i % len(SLUGS)]
+        n = i % 6 + 1
+        body = PAGE_BODY.format(slug=slug, n=n, other=SLUGS[(i + 1) % len(SLUGS)])
+        create_all_pages.create_treatment_page(
+            str(page), f'Terapi MSC {i} - 23Century.id', f'Terapi MSC {i}', body,
+        )
+
+
+def _html_stats(root_dir):
+    """Return (pages, total bytes) of the HTML files in root_dir."""
+    import site_index
+
+    files = site_index.find_all_html_files(root_dir)
+    return len(files), sum(os.path.getsize(f) for f in files)
+
+
+def _read_pages(root_dir):
+    import site_index
+
+    for html_file in sorted(site_index.find_all_html_files(root_dir)):
+        with open(html_file, 'r', encoding='utf-8', errors='ignore') as f:
+            yield f.read()
+
+
+def run_case(case, root_dir):
+    """Run one benchmark case in the current process; return its measurements."""
+    import audit_image_references
+    import fix_img_dimensions
+    import link_analyzer
+    import rewrite_pipeline
+    import site_index
+
+    # Caches left by an earlier run would make later runs warm-cache timings
+    for cache_file in CACHE_FILES:
+        try:
+            os.remove(Path(root_dir) / cache_file)
+        except FileNotFoundError:
+            pass
+
+    start = time.perf_counter()
+    if case == 'site_index':
+        site_index.build_index(root_dir)
+    elif case == 'link_analyzer':
+        index, _ = site_index.build_index(root_dir)
+        link_analyzer.analyze_pages(list(site_index.iter_pages(index)), str(root_dir))
+    elif case == 'audit_image_references':
+        audit_image_references.ROOT_DIR = Path(root_dir)
+        index, _ = site_index.build_index(root_dir)
+        for ref in sorted(audit_image_references.collect_image_references(index)):
+            audit_image_references.inspect_reference(ref)
+    elif case == 'rewrite_pipeline':
+        fix_img_dimensions.ROOT_DIR = Path(root_dir)
+        for content in _read_pages(root_dir):
+            rewrite_pipeline.run_stages(content)
+    else:
+        fix_img_dimensions.ROOT_DIR = Path(root_dir)
+        stage = next(s for s in rewrite_pipeline.STAGES if f'fixer:{s.name}' == case)
+        for content in _read_pages(root_dir):
+            stage.rewrite(content)
+    elapsed = time.perf_counter() - start
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak_mb = peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    return elapsed, peak_mb
+
+
+def benchmark_cases():
+    """Return the names of every benchmark case."""
+    import rewrite_pipeline
+
+    cases = ['site_index', 'link_analyzer', 'audit_image_references']
+    cases += [f'fixer:{stage.name}' for stage in rewrite_pipeline.STAGES]
+    cases.append('rewrite_pipeline')
+    return cases
+
+
+def run_benchmarks(sizes, workdir):
+    """Generate each site size and time every case in a fresh process."""
+    ctx = multiprocessing.get_context('spawn')
+    results = {}
+    for size in sizes:
+        root_dir = Path(workdir) / f'site-{size}'
+        print(f"\nGenerating {size} pages in {root_dir} ...")
+        generate_site(root_dir, size)
+        pages, total_bytes = _html_stats(root_dir)
+        mb = total_bytes / (1024 * 1024)
+        print(f"  {pages} pages, {mb:.1f} MB\n")
+
+        results[str(size)] = {}
+        for case in benchmark_cases():
+            # A fresh process per case keeps peak RSS readings independent
+            with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                elapsed, peak_mb = pool.submit(run_case, case, str(root_dir)).result()
+            results[str(size)][case] = {
+                'seconds': round(elapsed, 4),
+                'pages_per_s': round(pages / elapsed, 1),
+                'mb_per_s': round(mb / elapsed, 2),
+                'peak_rss_mb': round(peak_mb, 1),
+            }
+            print(f"  {case:32} {elapsed:8.3f}s {pages / elapsed:10.0f} pages/s "
+                  f"{mb / elapsed:8.2f} MB/s {peak_mb:8.1f} MB RSS")
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance):
+    """Return a list of regression messages for results worse than the baseline."""
+    regressions = []
+    for size, cases in results.items():
+        for case, current in cases.items():
+            base = baseline.get(size, {}).get(case)
+            if not base:
+                continue
+            if current['pages_per_s'] < base['pages_per_s'] * (1 - tolerance):
+                regressions.append(f"{case} @ {size} pages: {current['pages_per_s']} pages/s "
+                                   f"vs baseline {base['pages_per_s']}")
+            if current['peak_rss_mb'] > base['peak_rss_mb'] * (1 + tolerance):
+                regressions.append(f"{case} @ {size} pages: {current['peak_rss_mb']} MB peak RSS "
+                                   f"vs baseline {base['peak_rss_mb']}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the scan and rewrite scripts.')
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help='comma-separated site sizes in pages (default: %(default)s)')
+    parser.add_argument('--workdir', default=os.path.join(tempfile.gettempdir(), '23c-benchmark'),
+                        help='where synthetic sites are generated and kept (default: %(default)s)')
+    parser.add_argument('--baseline', default=str(BASELINE_FILE),
+                        help='baseline results file (default: %(default)s)')
+    parser.add_argument('--save-baseline', action='store_true',
+                        help='store these results as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='allowed slowdown / RSS growth before failing (default: %(default)s)')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("SCAN AND REWRITE BENCHMARKS")
+    print("=" * 80)
+
+    sizes = [int(size) for size in args.sizes.split(',') if size]
+    results = run_benchmarks(sizes, args.workdir)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print(f"\n✅ Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\n⚠️  No baseline at {args.baseline}; run with --save-baseline to create one")
+        return 0
+
+    with open(args.baseline, 'r', encoding='utf-8') as f:
+        baseline = json.load(f)
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+
+    print("\n" + "=" * 80)
+    if regressions:
+        print(f"❌ REGRESSION: {len(regressions)} case(s) worse than baseline by more than {args.tolerance:.0%}")
+        for message in regressions:
+            print(f"  - {message}")
+    else:
+        print(f"✅ No regressions against {args.baseline}")
+    print("=" * 80)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
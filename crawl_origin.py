@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+Mirror the original site into fetched_pages/ with a breadth-first crawl.
+
+The crawl is seeded from scripts/sitemap.xml (following nested sitemaps)
+and the hand-maintained URL lists in scripts/. URLs are deduplicated on
+their canonical form, robots.txt is honoured, and each level of the crawl
+is fetched concurrently through fetch_engine. Snapshots are written as they
+arrive using the existing naming (https://23c.jp/about/ ->
+23c.jp_about_.html), and with the fetch manifest an unchanged page costs a
+304 on the next run.
+
+Usage:
+    python3 crawl_origin.py [--depth 2] [--concurrency 8] [--max-pages 500]
+"""
+import argparse
+import os
+import re
+import urllib.robotparser
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit, urlunsplit, parse_qsl, urlencode
+
+import fetch_engine
+import fetch_manifest
+import html_refs
+import http_client
+from fetch_engine import FetchJob
+
+ROOT_DIR = Path('/Users/asiboro/Sources/Work/23centuryid')
+SITEMAP = 'scripts/sitemap.xml'
+SEED_LISTS = ['scripts/deeper_50_urls.txt', 'scripts/next_50_urls.txt', 'scripts/next_50_urls.clean.txt']
+OUT_DIR = 'fetched_pages/deeper'
+DEPTH = 2
+LOC_PATTERN = re.compile(r'<loc>\s*([^<\s]+)\s*</loc>')
+URL_PATTERN = re.compile(r'https?://[^\s<>"\']+')
+SKIP_PREFIXES = ('/wp-admin/', '/wp-json/', '/wp-content/', '/wp-includes/', '/feed/', '/xmlrpc.php')
+ASSET_EXTENSIONS = {
+    '.css', '.js', '.json', '.xml', '.txt', '.pdf', '.zip', '.png', '.jpg', '.jpeg', '.gif',
+    '.webp', '.svg', '.ico', '.mp4', '.webm', '.woff', '.woff2', '.ttf',
+}
+
+
+def canonical_url(url):
+    """Normalize a URL for deduplication: lowercase host, no fragment, '/' path."""
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and (scheme, parts.port) not in (('http', 80), ('https', 443)):
+        host = f'{host}:{parts.port}'
+    path = re.sub(r'/{2,}', '/', parts.path or '/')
+    query = urlencode(sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+                             if not k.startswith('utm_')))
+    return urlunsplit((scheme, host, path, query, ''))
+
+
+def snapshot_name(url):
+    """File name of a page snapshot: https://23c.jp/about/ -> 23c.jp_about_.html"""
+    parts = urlsplit(url)
+    name = (parts.netloc + parts.path).replace('/', '_')
+    if parts.query:
+        name += '_' + re.sub(r'[^A-Za-z0-9=-]+', '_', parts.query)
+    return name + '.html'
+
+
+def is_page_url(url, hosts):
+    """Check whether a canonical URL is an in-scope HTML page worth crawling."""
+    parts = urlsplit(url)
+    if parts.scheme not in ('http', 'https') or parts.netloc not in hosts:
+        return False
+    if parts.path.startswith(SKIP_PREFIXES):
+        return False
+    return os.path.splitext(parts.path)[1].lower() not in ASSET_EXTENSIONS
+
+
+def read_sitemap_urls(text, client=None, seen=None):
+    """Page URLs from a sitemap, fetching nested sitemaps when a client is given."""
+    seen = seen if seen is not None else set()
+    urls = []
+    for loc in LOC_PATTERN.findall(text):
+        if loc.endswith('.xml'):
+            if client is None or loc in seen:
+                continue
+            seen.add(loc)
+            try:
+                nested = client.get(loc)
+            except Exception as e:
+                print(f"  ⚠️  sitemap {loc}: {e}")
+                continue
+            if nested.status == 200:
+                urls.extend(read_sitemap_urls(nested.body.decode('utf-8', errors='ignore'), client, seen))
+        else:
+            urls.append(loc)
+    return urls
+
+
+def read_seeds(root_dir, client=None):
+    """Seed URLs from the sitemap and the URL lists, in order, deduplicated."""
+    seeds = []
+    for rel_path in [SITEMAP] + SEED_LISTS:
+        path = Path(root_dir) / rel_path
+        if not path.exists():
+            # A typo in the seed list must not quietly shrink the crawl
+            print(f"⚠️  Seed source {rel_path} not found")
+            continue
+        text = path.read_text(encoding='utf-8', errors='ignore')
+        if rel_path == SITEMAP:
+            found = read_sitemap_urls(text, client)
+        else:
+            # Some lists lost their newlines; pick URLs out of the text instead
+            found = URL_PATTERN.findall(text)
+        if not found:
+            print(f"⚠️  Seed source {rel_path} has no URLs")
+        seeds.extend(found)
+    return list(dict.fromkeys(canonical_url(url) for url in seeds))
+
+
+def load_robots(client, origin):
+    """Parse origin's robots.txt; a missing file allows everything."""
+    robots = urllib.robotparser.RobotFileParser(urljoin(origin, '/robots.txt'))
+    try:
+        response = client.get(robots.url)
+    except Exception:
+        response = None
+    if response is None or response.status >= 400:
+        robots.allow_all = True
+    else:
+        robots.parse(response.body.decode('utf-8', errors='ignore').splitlines())
+    return robots
+
+
+def extract_links(path, page_url):
+    """Canonical absolute URLs of every <a href> in a saved snapshot."""
+    links = []
+    for ref in html_refs.extract_file_references(path):
+        if ref.kind == 'anchor' and not ref.url.startswith(('#', 'mailto:', 'tel:', 'javascript:')):
+            links.append(canonical_url(urljoin(page_url, ref.url)))
+    return links
+
+
+def crawl(seeds, out_dir, depth=DEPTH, max_pages=None, manifest=None, **options):
+    """Crawl breadth-first from seeds; return {'saved', 'unchanged', 'failed', 'blocked'} counts."""
+    client = options.get('client') or http_client.shared_client()
+    hosts = {urlsplit(url).netloc for url in seeds}
+    robots = {}
+    counts = dict.fromkeys(('saved', 'unchanged', 'failed', 'blocked'), 0)
+    seen = set(seeds)
+    frontier = list(seeds)
+    pages = 0
+
+    for level in range(depth + 1):
+        if not frontier:
+            break
+        jobs = []
+        for url in frontier:
+            parts = urlsplit(url)
+            origin = f'{parts.scheme}://{parts.netloc}'
+            if origin not in robots:
+                robots[origin] = load_robots(client, origin)
+            if not robots[origin].can_fetch(http_client.USER_AGENT, url):
+                counts['blocked'] += 1
+                continue
+            if max_pages is not None and pages >= max_pages:
+                break
+            pages += 1
+            jobs.append(FetchJob(url, os.path.join(out_dir, snapshot_name(url)), url))
+        print(f"\nLevel {level}: {len(jobs)} pages")
+
+        def report(result):
+            if result.ok and result.status == 304:
+                counts['unchanged'] += 1
+                print(f"  = {result.job.label}")
+            elif result.ok:
+                counts['saved'] += 1
+                print(f"  ✓ {result.job.label}")
+            else:
+                counts['failed'] += 1
+                print(f"  ✗ {result.job.label}: {result.error}")
+
+        results = fetch_engine.run_jobs(jobs, on_result=report, manifest=manifest, **options)
+
+        frontier = []
+        if level == depth:
+            break
+        for result in results:
+            if not result.ok:
+                continue
+            for link in extract_links(result.job.save_path, result.job.url):
+                if link not in seen and is_page_url(link, hosts):
+                    seen.add(link)
+                    frontier.append(link)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Mirror the original site into fetched_pages/.')
+    parser.add_argument('--out', default=str(ROOT_DIR / OUT_DIR),
+                        help='snapshot directory (default: %(default)s)')
+    parser.add_argument('--depth', type=int, default=DEPTH,
+                        help='link levels to follow beyond the seeds (default: %(default)s)')
+    parser.add_argument('--concurrency', type=int, default=fetch_engine.CONCURRENCY,
+                        help='pages in flight at once (default: %(default)s)')
+    parser.add_argument('--rate', type=float, default=fetch_engine.RATE_PER_HOST,
+                        help='requests per second per host (default: %(default)s)')
+    parser.add_argument('--max-pages', type=int, default=None, help='stop after this many pages')
+    parser.add_argument('--base-url', default=None,
+                        help='send requests to this origin instead, e.g. http://127.0.0.1:8023')
+    args = parser.parse_args()
+    http_client.set_base_url(args.base_url)
+
+    print("=" * 80)
+    print("CRAWLING ORIGIN SITE")
+    print("=" * 80)
+
+    seeds = read_seeds(ROOT_DIR, http_client.shared_client())
+    print(f"Seeds: {len(seeds)} URLs, depth {args.depth}")
+
+    manifest = fetch_manifest.load_manifest(ROOT_DIR)
+    counts = crawl(seeds, args.out, args.depth, args.max_pages, manifest,
+                   concurrency=args.concurrency, rate=args.rate)
+
+    print(f"\n{'-' * 80}")
+    print(f"Saved {counts['saved']}, unchanged {counts['unchanged']}, "
+          f"failed {counts['failed']}, blocked by robots.txt {counts['blocked']}")
+    print(f"Snapshots in {args.out}")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,48 +3,9 @@
 Fetch missing images and create missing content pages for 23Century.id
 """
 import os
-import struct
-import zlib
 from pathlib import Path
 
-def create_png_placeholder(filepath, width=800, height=600):
-    """Create a simple PNG placeholder image without PIL"""
-    # Create a minimal valid PNG file (1x1 gray pixel, scaled up)
-    # This creates a very basic gray PNG
-    
-    # PNG header
-    png_header = b'\x89PNG\r\n\x1a\n'
-    
-    # IHDR chunk (image header)
-    ihdr_data = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
-    ihdr_crc = zlib.crc32(b'IHDR' + ihdr_data) & 0xffffffff
-    ihdr_chunk = struct.pack('>I', 13) + b'IHDR' + ihdr_data + struct.pack('>I', ihdr_crc)
-    
-    # IDAT chunk (image data - a simple gray image)
-    raw_data = b''
-    gray = bytes([200, 200, 200])  # Gray color (RGB)
-    for y in range(height):
-        raw_data += b'\x00'  # Filter type for this line
-        for x in range(width):
-            raw_data += gray
-    
-    compressed_data = zlib.compress(raw_data, 9)
-    idat_crc = zlib.crc32(b'IDAT' + compressed_data) & 0xffffffff
-    idat_chunk = struct.pack('>I', len(compressed_data)) + b'IDAT' + compressed_data + struct.pack('>I', idat_crc)
-    
-    # IEND chunk (end marker)
-    iend_crc = zlib.crc32(b'IEND') & 0xffffffff
-    iend_chunk = struct.pack('>I', 0) + b'IEND' + struct.pack('>I', iend_crc)
-    
-    # Write PNG file
-    with open(filepath, 'wb') as f:
-        f.write(png_header + ihdr_chunk + idat_chunk + iend_chunk)
-
-def create_webp_placeholder(filepath, width=800, height=600):
-    """Create a minimal WebP placeholder image"""
-    # For now, create as PNG and rename - WebP is more complex
-    # In production, you'd want to convert or fetch real images
-    create_png_placeholder(filepath, width, height)
+import placeholder_image
 
 def create_missing_images():
     """Create placeholder images for missing theme assets"""
@@ -87,11 +48,9 @@ def create_missing_images():
         filepath = os.path.join(img_dir, filename)
         if not os.path.exists(filepath):
             try:
-                if filename.endswith('.webp'):
-                    create_webp_placeholder(filepath, width, height)
-                elif filename.endswith(('.png', '.jpg')):
-                    create_png_placeholder(filepath, width, height)
-                print(f"  ✓ Created {filename} ({width}x{height})")
+                label = os.path.splitext(filename)[0]
+                size = placeholder_image.write_placeholder(filepath, width, height, label)
+                print(f"  ✓ Created {filename} ({width}x{height}, {size:,} bytes)")
             except Exception as e:
                 print(f"  ✗ Failed to create {filename}: {e}")
         else:
@@ -5,41 +5,11 @@ and update HTML files to reference them from /assets/img/
 """
 
 import os
-import struct
-import zlib
 from pathlib import Path
 import re
 
-def create_png_placeholder(width=1024, height=512, text="Image"):
-    """Create a simple PNG placeholder image"""
-    # PNG header
-    png_header = b'\x89PNG\r\n\x1a\n'
-    
-    # IHDR chunk (image header)
-    ihdr_data = struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0)
-    ihdr_crc = zlib.crc32(b'IHDR' + ihdr_data) & 0xffffffff
-    ihdr_chunk = struct.pack('>I', 13) + b'IHDR' + ihdr_data + struct.pack('>I', ihdr_crc)
-    
-    # Create image data (gray background)
-    raw_data = b''
-    gray = struct.pack('BBB', 200, 200, 200)
-    for y in range(height):
-        raw_data += b'\x00'  # Filter type for each scanline
-        for x in range(width):
-            raw_data += gray
-    
-    # Compress the data
-    compressed = zlib.compress(raw_data)
-    
-    # IDAT chunk (image data)
-    idat_crc = zlib.crc32(b'IDAT' + compressed) & 0xffffffff
-    idat_chunk = struct.pack('>I', len(compressed)) + b'IDAT' + compressed + struct.pack('>I', idat_crc)
-    
-    # IEND chunk (image end)
-    iend_crc = zlib.crc32(b'IEND') & 0xffffffff
-    iend_chunk = struct.pack('>I', 0) + b'IEND' + struct.pack('>I', iend_crc)
-    
-    return png_header + ihdr_chunk + idat_chunk + iend_chunk
+import placeholder_image
+import site_index
 
 def create_placeholder_images():
     """Create placeholder images for missing assets"""
@@ -86,18 +56,15 @@ def create_placeholder_images():
             img_path.write_text(svg_content)
             print(f"  ✓ Created {img_name} (SVG placeholder)")
             created += 1
-        elif img_name.endswith(".png"):
-            # Create PNG placeholder
-            png_data = create_png_placeholder(width, height, img_name)
-            img_path.write_bytes(png_data)
-            print(f"  ✓ Created {img_name} ({len(png_data)} bytes)")
-            created += 1
         else:
-            # For WEBP and JPG, create PNG with appropriate name
-            # Note: These should ideally be WEBP/JPG, but PNG is easier to generate
-            png_data = create_png_placeholder(width, height, img_name)
-            img_path.write_bytes(png_data)
-            print(f"  ✓ Created {img_name} ({len(png_data)} bytes)")
+            # PNG, WebP or JPEG encoding follows the extension
+            try:
+                data = placeholder_image.create_placeholder(img_name, width, height, img_path.stem)
+            except ValueError as e:
+                print(f"  ✗ {img_name}: {e}")
+                continue
+            img_path.write_bytes(data)
+            print(f"  ✓ Created {img_name} ({len(data)} bytes)")
             created += 1
     
     print(f"\nTotal placeholder images created: {created}\n")
@@ -126,38 +93,36 @@ def update_html_to_use_local_images():
     files_updated = 0
     replacements_made = 0
     
-    for root, dirs, files in os.walk("."):
-        # Skip certain directories
-        dirs[:] = [d for d in dirs if d not in [".git", "node_modules", "__pycache__"]]
+    index = site_index.load_index(".")
+    candidates = site_index.pages_containing(
+        index, [wp_path for _, wp_path in image_mappings.values()], "."
+    )
+    
+    for rel_path in candidates:
+        filepath = os.path.join(".", rel_path)
         
-        for file in files:
-            if not file.endswith(".html"):
-                continue
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                content = f.read()
             
-            filepath = os.path.join(root, file)
+            updated_content = content
+            made_change = False
             
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                updated_content = content
-                made_change = False
-                
-                # Replace WordPress image paths with local paths
-                for img_name, (local_path, wp_path) in image_mappings.items():
-                    if wp_path in updated_content:
-                        updated_content = updated_content.replace(wp_path, local_path)
-                        made_change = True
-                        replacements_made += 1
+            # Replace WordPress image paths with local paths
+            for img_name, (local_path, wp_path) in image_mappings.items():
+                if wp_path in updated_content:
+                    updated_content = updated_content.replace(wp_path, local_path)
+                    made_change = True
+                    replacements_made += 1
+            
+            if made_change:
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    f.write(updated_content)
+                print(f"  ✓ Updated {filepath}")
+                files_updated += 1
                 
-                if made_change:
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        f.write(updated_content)
-                    print(f"  ✓ Updated {filepath}")
-                    files_updated += 1
-                    
-            except Exception as e:
-                print(f"  ✗ Error processing {filepath}: {e}")
+        except Exception as e:
+            print(f"  ✗ Error processing {filepath}: {e}")
     
     print(f"\nTotal files updated: {files_updated}")
     print(f"Total replacements made: {replacements_made}\n")
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Bulk-download the WordPress uploads listed in assets/uploads_urls.txt.
+
+Every URL becomes a job in a persistent queue (.download_queue.json) with a
+state of pending, in_progress, done or failed, saved on every transition.
+Downloads go to a .part file in .download_parts/, outside the asset tree,
+that is resumed with an HTTP Range/If-Range request after an interruption
+and renamed into assets/img only once complete.
+Several streams run in parallel through fetch_engine (per-host rate limit,
+retries) under one global bandwidth cap, so a long list finishes in a
+single unattended run and a killed run picks up where it stopped.
+
+Usage:
+    python3 download_uploads.py [--streams 4] [--bandwidth 1024] [--retry-failed]
+"""
+import argparse
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+import urllib.error
+from urllib.parse import urlsplit
+
+import fetch_engine
+import http_client
+from fetch_engine import FetchJob
+
+URL_LIST = 'assets/uploads_urls.txt'
+IMG_DIR = 'assets/img'
+QUEUE_FILE = '.download_queue.json'
+PART_DIR = '.download_parts'
+MAX_SIZE = 10 * 1024 * 1024
+CHUNK_SIZE = 64 * 1024
+STREAMS = 4
+BANDWIDTH_KB = 1024     # global cap in KiB/s, 0 for unlimited
+
+PENDING = 'pending'
+IN_PROGRESS = 'in_progress'
+DONE = 'done'
+FAILED = 'failed'
+STATES = (PENDING, IN_PROGRESS, DONE, FAILED)
+
+
+class JobQueue:
+    """Persistent url -> {path, state, error} queue, saved on every change."""
+
+    def __init__(self, path, jobs=None):
+        self.path = path
+        self.jobs = jobs or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        """Load the queue; jobs left in_progress by an interrupted run become pending."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                jobs = json.load(f)
+        except (OSError, ValueError):
+            jobs = {}
+        for job in jobs.values():
+            if job['state'] == IN_PROGRESS:
+                job['state'] = PENDING
+        return cls(path, jobs)
+
+    def _save(self):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.jobs, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def add(self, url, path):
+        """Queue url unless it is already known; files already on disk are done."""
+        with self._lock:
+            if url not in self.jobs:
+                state = DONE if os.path.exists(path) else PENDING
+                self.jobs[url] = {'path': path, 'state': state, 'error': ''}
+                self._save()
+
+    def set_state(self, url, state, error=''):
+        with self._lock:
+            self.jobs[url].update(state=state, error=error)
+            self._save()
+
+    def retry_failed(self):
+        with self._lock:
+            for job in self.jobs.values():
+                if job['state'] == FAILED:
+                    job.update(state=PENDING, error='')
+            self._save()
+
+    def with_state(self, state):
+        return [(url, job) for url, job in sorted(self.jobs.items()) if job['state'] == state]
+
+    def counts(self):
+        counts = dict.fromkeys(STATES, 0)
+        for job in self.jobs.values():
+            counts[job['state']] += 1
+        return counts
+
+
+class BandwidthLimiter:
+    """Global bytes-per-second cap shared by every download thread."""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.allowance = rate
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def consume(self, nbytes):
+        """Account for nbytes just transferred, sleeping if over the cap."""
+        if not self.rate:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self.allowance = min(self.rate, self.allowance + (now - self.updated) * self.rate)
+            self.updated = now
+            self.allowance -= nbytes
+            wait = -self.allowance / self.rate if self.allowance < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+def total_size(response, offset):
+    """Full size of the remote file from Content-Range or Content-Length, or None."""
+    content_range = response.getheader('Content-Range')
+    if content_range and '/' in content_range:
+        total = content_range.rsplit('/', 1)[1]
+        return int(total) if total.isdigit() else None
+    length = response.getheader('Content-Length')
+    return offset + int(length) if length and length.isdigit() else None
+
+
+def part_paths(job, part_dir=PART_DIR):
+    """Return the (.part, .validator) paths for job, keyed on a hash of its URL."""
+    key = hashlib.sha256(job.url.encode('utf-8')).hexdigest()[:16]
+    part_path = os.path.join(part_dir, f'{key}-{os.path.basename(job.save_path)}.part')
+    return part_path, part_path + '.validator'
+
+
+def response_validator(response):
+    """Return the strong ETag or Last-Modified usable as an If-Range validator, or ''."""
+    etag = response.getheader('ETag') or ''
+    if etag and not etag.startswith('W/'):
+        return etag
+    return response.getheader('Last-Modified') or ''
+
+
+def _remove(*paths):
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def download_resumable(job, client, manifest=None, queue=None, limiter=None, max_size=MAX_SIZE,
+                       part_dir=PART_DIR):
+    """Download job.url to job.save_path, resuming from a .part file in part_dir if present.
+
+    A resume is sent with If-Range set to the ETag or Last-Modified of the
+    response the .part file was started from, so if the remote file changed
+    in between the server answers 200 with the whole new file and the
+    download starts over instead of appending the new file's tail.
+    """
+    if queue:
+        queue.set_state(job.url, IN_PROGRESS)
+    os.makedirs(part_dir, exist_ok=True)
+    part_path, validator_path = part_paths(job, part_dir)
+    offset = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    validator = ''
+    if offset and os.path.exists(validator_path):
+        with open(validator_path, 'r', encoding='utf-8') as f:
+            validator = f.read().strip()
+    # Without a validator there is no way to tell the .part file is still current
+    headers = {'Range': f'bytes={offset}-', 'If-Range': validator} if offset and validator else None
+
+    with client.open(job.url, headers) as response:
+        if response.status == 416:
+            # The .part file does not match the remote file any more; start over
+            _remove(part_path, validator_path)
+            raise OSError(f"range not satisfiable for {job.url}, restarting")
+        if response.status >= 400:
+            raise urllib.error.HTTPError(job.url, response.status, response.reason, response.headers, None)
+        if response.status != 206 or not headers:
+            offset = 0
+            validator = response_validator(response)
+            if validator:
+                with open(validator_path, 'w', encoding='utf-8') as f:
+                    f.write(validator)
+            else:
+                _remove(validator_path)
+        size = total_size(response, offset)
+        if max_size and size and size > max_size:
+            raise ValueError(f"too large ({size:,} bytes > {max_size:,})")
+
+        os.makedirs(os.path.dirname(job.save_path), exist_ok=True)
+        with open(part_path, 'ab' if offset else 'wb') as out_file:
+            while True:
+                chunk = response.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                out_file.write(chunk)
+                offset += len(chunk)
+                if max_size and offset > max_size:
+                    out_file.close()
+                    _remove(part_path, validator_path)
+                    raise ValueError(f"too large (over {max_size:,} bytes)")
+                if limiter:
+                    limiter.consume(len(chunk))
+
+    if size is not None and offset != size:
+        raise OSError(f"incomplete download ({offset:,} of {size:,} bytes)")
+    os.replace(part_path, job.save_path)
+    _remove(validator_path)
+    return response.status
+
+
+def read_url_list(path):
+    """Yield the http(s) URLs in a list file, one per line."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            url = line.strip()
+            if url.startswith('http'):
+                yield url
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk-download WordPress uploads with resume.')
+    parser.add_argument('--urls', default=URL_LIST, help='URL list (default: %(default)s)')
+    parser.add_argument('--dest', default=IMG_DIR, help='destination directory (default: %(default)s)')
+    parser.add_argument('--queue', default=QUEUE_FILE, help='queue file (default: %(default)s)')
+    parser.add_argument('--parts', default=PART_DIR,
+                        help='directory for partial downloads (default: %(default)s)')
+    parser.add_argument('--streams', type=int, default=STREAMS,
+                        help='parallel downloads (default: %(default)s)')
+    parser.add_argument('--bandwidth', type=int, default=BANDWIDTH_KB,
+                        help='global bandwidth cap in KiB/s, 0 for unlimited (default: %(default)s)')
+    parser.add_argument('--max-size', type=int, default=MAX_SIZE,
+                        help='skip files larger than this many bytes (default: %(default)s)')
+    parser.add_argument('--retry-failed', action='store_true', help='re-queue failed jobs')
+    parser.add_argument('--base-url', default=None,
+                        help='send requests to this origin instead, e.g. http://127.0.0.1:8023')
+    args = parser.parse_args()
+    http_client.set_base_url(args.base_url)
+
+    print("=" * 80)
+    print("DOWNLOADING WORDPRESS UPLOADS")
+    print("=" * 80)
+
+    if not os.path.isfile(args.urls):
+        print(f"URL list {args.urls} not found.")
+        return
+
+    queue = JobQueue.load(args.queue)
+    for url in read_url_list(args.urls):
+        filename = os.path.basename(urlsplit(url).path)
+        if filename:
+            queue.add(url, os.path.join(args.dest, filename))
+    if args.retry_failed:
+        queue.retry_failed()
+
+    pending = queue.with_state(PENDING)
+    print(f"Queue: {queue.counts()}\n")
+
+    def report(result):
+        if result.ok:
+            queue.set_state(result.job.url, DONE)
+            print(f"  ✓ {result.job.label}")
+        else:
+            queue.set_state(result.job.url, FAILED, result.error)
+            print(f"  ✗ {result.job.label}: {result.error}")
+
+    limiter = BandwidthLimiter(args.bandwidth * 1024)
+    download = functools.partial(download_resumable, queue=queue, limiter=limiter, max_size=args.max_size,
+                                 part_dir=args.parts)
+    jobs = [FetchJob(url, job['path'], os.path.basename(job['path'])) for url, job in pending]
+    fetch_engine.run_jobs(jobs, on_result=report, concurrency=args.streams, download=download)
+
+    print(f"\n{'-' * 80}")
+    print(f"Queue: {queue.counts()}")
+    for url, job in queue.with_state(FAILED):
+        print(f"  ✗ {url}: {job['error']}")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,120 +1,117 @@
 #!/usr/bin/env python3
 """
 Fetch all missing responsive image variants from origin site.
+
+The variants to fetch are discovered from the srcset attributes in
+fetched_pages/ (full upload URLs) and in the live pages (local
+/assets/img/ file names with their widths), so only variants the origin
+actually serves are requested, all in parallel through fetch_engine. The
+upload folder of a local-only variant is looked up in the remote path index,
+or taken from a sibling variant seen in fetched_pages/; variants found in
+neither are reported as unknown and skipped.
+With --refresh, variants that already exist are re-validated with
+conditional GETs against .fetch_manifest.json instead of being skipped.
 """
 
-import subprocess
+import argparse
+import os
+import posixpath
+import re
 from pathlib import Path
+from urllib.parse import urlsplit
+
+import fetch_engine
+import fetch_manifest
+import http_client
+import remote_paths
+import site_index
+from fetch_engine import FetchJob
 
 ROOT_DIR = Path('/Users/asiboro/Sources/Work/23centuryid')
 ORIGIN = 'https://23c.jp'
+UPLOADS_PREFIX = '/wp-content/uploads/'
+VARIANT_PATTERN = re.compile(r'^(?P<base>.+?)(?:-\d+x\d+)?\.(?P<ext>[A-Za-z0-9]+)$')
+
+def base_name(filename):
+    """Strip the -WxH size suffix and extension: 'about-300x200.webp' -> 'about'."""
+    match = VARIANT_PATTERN.match(filename)
+    return match.group('base') if match else filename
 
-# List of images needing all variants (1200w, 1024w, 768w, 300w versions)
-base_images = [
-    ('about', '2025/03'),
-    ('cell-laboratory', '2025/03'),
-    ('msc-therapy-alzheimers', '2025/04'),
-    ('msc-therapy-amd', '2025/04'),
-    ('msc-therapy-asd', '2025/04'),
-    ('msc-therapy-blindness', '2025/04'),
-    ('msc-therapy-chronic-pain', '2025/04'),
-    ('msc-therapy-diabetes', '2025/04'),
-    ('msc-therapy-liver-cirrhosis', '2025/04'),
-    ('msc-therapy-osteoarthritis', '2025/04'),
-    ('msc-therapy-parkinsons-disease', '2025/04'),
-    ('msc-therapy-post-mi-heart-failure', '2025/04'),
-    ('msc-therapy-post-stroke-sequelae', '2025/04'),
-    ('msc-therapy-renal-failure', '2025/04'),
-    ('msc-therapy-snhl', '2025/04'),
-    ('msc-therapy-spinal-cord-injury', '2025/04'),
-    ('msc-treatment-rheumatoid-arthritis-2_01', '2025/04'),
-    ('globalhealth-award-2025-1', '2025/06'),
-    ('globalhealth-award-2025-2', '2025/10'),
-]
-
-def fetch_image_variants(base_name, date_path):
-    """Fetch all responsive variants of an image."""
-    # Determine extension based on name
-    if 'globalhealth' in base_name or 'award' in base_name:
-        ext = 'jpg'
-    else:
-        ext = 'webp'
-    
-    variants = [
-        (f'{base_name}.{ext}', ''),  # Full size (1200w)
-        (f'{base_name}-300x200.{ext}', '300x200'),
-        (f'{base_name}-1024x683.{ext}', '1024x683'),
-        (f'{base_name}-768x512.{ext}', '768x512'),
-    ]
-    
-    # Special handling for specific images
-    if 'rheumatoid' in base_name:
-        variants = [
-            (f'{base_name}.{ext}', ''),
-            (f'{base_name}-300x134.{ext}', '300x134'),
-            (f'{base_name}-1024x459.{ext}', '1024x459'),
-            (f'{base_name}-768x344.{ext}', '768x344'),
-        ]
-    elif 'globalhealth-award-2025-1' in base_name:
-        variants = [
-            (f'{base_name}.{ext}', ''),
-            (f'{base_name}-300x203.{ext}', '300x203'),
-            (f'{base_name}-768x518.{ext}', '768x518'),
-            (f'{base_name}-1536x1037.{ext}', '1536x1037'),
-        ]
-    elif 'globalhealth-award-2025-2' in base_name:
-        variants = [
-            (f'{base_name}.{ext}', ''),
-            (f'{base_name}-225x300.{ext}', '225x300'),
-            (f'{base_name}-768x1024.{ext}', '768x1024'),
-        ]
-    elif 'rheumatoid' in base_name:
-        pass
-    elif any(x in base_name for x in ['renal', 'snhl', 'spinal']):
-        variants = [
-            (f'{base_name}.{ext}', ''),
-            (f'{base_name}-300x152.{ext}', '300x152'),
-            (f'{base_name}-1024x520.{ext}', '1024x520'),
-            (f'{base_name}-768x390.{ext}', '768x390'),
-        ]
-    
-    success = 0
-    for filename, desc in variants:
-        origin_url = f'{ORIGIN}/wp-content/uploads/{date_path}/{filename}'
-        local_path = ROOT_DIR / 'assets' / 'img' / filename
-        
-        if local_path.exists():
+def discover_variants(index, remote_index=None):
+    """Map every srcset variant file name to (remote path or None, descriptor)."""
+    variants = {}
+    for _, ref in site_index.iter_references(index, kinds={'srcset'}):
+        path = urlsplit(ref['url']).path
+        filename = posixpath.basename(path)
+        if not filename:
+            continue
+        if path.startswith(UPLOADS_PREFIX):
+            variants[filename] = (path, ref['descriptor'])
+        elif path.startswith('/assets/img/') and filename not in variants:
+            variants[filename] = (None, ref['descriptor'])
+
+    # Local-only variants live in the same upload folder as their siblings
+    folders = {}
+    for path, _ in variants.values():
+        if path:
+            folders[base_name(posixpath.basename(path))] = posixpath.dirname(path)
+    for filename, (path, descriptor) in variants.items():
+        if path is None and remote_index:
+            path = remote_paths.resolve(remote_index, filename)
+            variants[filename] = (path, descriptor)
+        if path is None and base_name(filename) in folders:
+            variants[filename] = (f'{folders[base_name(filename)]}/{filename}', descriptor)
+    return variants
+
+def fetch_variants(variants, refresh=False, **options):
+    """Fetch the variants missing from assets/img in parallel; return (fetched, failed)."""
+    img_dir = ROOT_DIR / 'assets' / 'img'
+    jobs = []
+    for filename, (path, descriptor) in sorted(variants.items()):
+        if path is None:
+            print(f'⚠️  {filename} - upload folder unknown, skipped')
+            continue
+        if (img_dir / filename).exists() and not refresh:
             continue  # Skip if already exists
-        
-        cmd = ['curl', '-s', origin_url, '-o', str(local_path)]
-        subprocess.run(cmd, capture_output=True)
-        
-        if local_path.exists() and local_path.stat().st_size > 0:
-            size = local_path.stat().st_size
-            print(f'✅ {filename} ({size:,} bytes)')
-            success += 1
+        jobs.append(FetchJob(f'{ORIGIN}{path}', str(img_dir / filename), f'{filename} ({descriptor})'))
+
+    def report(result):
+        if result.ok and result.status == 304:
+            print(f'= {result.job.label} unchanged')
+        elif result.ok:
+            size = os.path.getsize(result.job.save_path)
+            print(f'✅ {result.job.label} ({size:,} bytes)')
         else:
-            if local_path.exists():
-                local_path.unlink()
-            print(f'⚠️  {filename} - not found')
-    
-    return success
+            print(f'⚠️  {result.job.label} - {result.error}')
+
+    results = fetch_engine.run_jobs(jobs, on_result=report, **options)
+    fetched = sum(1 for result in results if result.ok and result.status != 304)
+    failed = sum(1 for result in results if not result.ok)
+    return fetched, failed
 
 def main():
+    parser = argparse.ArgumentParser(description='Fetch missing responsive image variants.')
+    parser.add_argument('--refresh', action='store_true',
+                        help='re-validate existing files with conditional GETs instead of skipping them')
+    parser.add_argument('--base-url', default=None,
+                        help='send requests to this origin instead, e.g. http://127.0.0.1:8023')
+    args = parser.parse_args()
+    http_client.set_base_url(args.base_url)
+
     print("=" * 80)
     print("FETCHING ALL MISSING RESPONSIVE IMAGE VARIANTS")
     print("=" * 80)
     print()
-    
-    total_success = 0
-    for base_name, date_path in base_images:
-        print(f"📦 Fetching: {base_name}")
-        success = fetch_image_variants(base_name, date_path)
-        total_success += success
-        print()
-    
+
+    index = site_index.load_index(ROOT_DIR)
+    variants = discover_variants(index, remote_paths.load_remote_paths(ROOT_DIR))
+    print(f"📦 Found {len(variants)} variants in srcset attributes\n")
+
+    fetched, failed = fetch_variants(variants, args.refresh, manifest=fetch_manifest.load_manifest(ROOT_DIR))
+
+    print()
     print("=" * 80)
-    print(f"✅ Successfully fetched {total_success} images")
+    print(f"✅ Successfully fetched {fetched} images, {failed} failed")
     print("=" * 80)
 
 if __name__ == '__main__':
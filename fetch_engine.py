@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Concurrent fetch engine for downloads from the original site.
+
+Jobs run on an asyncio event loop with a bounded number of downloads in
+flight. Politeness is enforced per host with a token bucket (a steady
+request rate with a small burst) instead of a fixed sleep after every
+download, and transient failures (connection errors, 429 and 5xx) are
+retried with jittered exponential backoff. The blocking HTTP request itself
+runs in a worker thread on the shared keep-alive pool from http_client, so
+the engine needs nothing beyond the stdlib. Given a fetch_manifest, each
+request is conditional and an unchanged file costs a 304 with no body.
+"""
+import asyncio
+import hashlib
+import http.client
+import os
+import random
+import tempfile
+import time
+import urllib.error
+from typing import Callable, NamedTuple, Optional
+from urllib.parse import urlparse
+
+import http_client
+
+CONCURRENCY = 8
+RATE_PER_HOST = 4.0     # requests per second, per host
+BURST_PER_HOST = 4
+RETRIES = 3
+BACKOFF = 0.5           # seconds, doubled on every retry
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class FetchJob(NamedTuple):
+    """One URL to download to save_path.
+
+    If transform is given, the body is decoded as UTF-8, passed through
+    transform(str) -> str and written as text; otherwise bytes are written
+    unchanged.
+    """
+    url: str
+    save_path: str
+    label: str = ''
+    transform: Optional[Callable] = None
+
+
+class FetchResult(NamedTuple):
+    job: FetchJob
+    ok: bool
+    status: Optional[int]
+    error: str
+    attempts: int
+
+
+class TokenBucket:
+    """Allow `rate` acquisitions per second with bursts of up to `burst`."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+def _write_atomic(path, data):
+    """Write bytes to path via a temp file in the same directory and a rename."""
+    directory, name = os.path.split(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{name}.', suffix='.part')
+    try:
+        with os.fdopen(fd, 'wb') as out_file:
+            out_file.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def download(job, client, manifest=None, max_size=http_client.MAX_DOWNLOAD_SIZE):
+    """Blocking download of one job; returns the HTTP status (304 if unchanged).
+
+    Plain files are streamed to disk; pages with a transform are small, so
+    they are read whole, transformed and then written atomically.
+    """
+    headers = manifest.conditional_headers(job.url, job.save_path) if manifest else None
+    if job.transform is None:
+        result = client.download(job.url, job.save_path, headers, max_size)
+        status, response_headers, size, sha256 = result
+    else:
+        response = client.fetch(job.url, headers)
+        status, response_headers = response.status, response.headers
+        if status != 304:
+            data = job.transform(response.body.decode('utf-8', errors='ignore')).encode('utf-8')
+            _write_atomic(job.save_path, data)
+            size, sha256 = len(data), hashlib.sha256(data).hexdigest()
+    if manifest and status != 304:
+        manifest.record(job.url, job.save_path, response_headers, size, sha256)
+    return status
+
+
+class FetchEngine:
+    """Runs FetchJobs concurrently with per-host rate limits and retries."""
+
+    def __init__(self, concurrency=CONCURRENCY, rate=RATE_PER_HOST, burst=BURST_PER_HOST,
+                 retries=RETRIES, backoff=BACKOFF, client=None, manifest=None,
+                 download=download):
+        self.concurrency = concurrency
+        self.rate = rate
+        self.burst = burst
+        self.retries = retries
+        self.backoff = backoff
+        self.client = client or http_client.shared_client()
+        self.manifest = manifest
+        self.download = download
+        self._buckets = {}
+
+    def _bucket(self, url):
+        host = urlparse(url).netloc
+        if host not in self._buckets:
+            self._buckets[host] = TokenBucket(self.rate, self.burst)
+        return self._buckets[host]
+
+    async def _fetch(self, job, semaphore, on_result):
+        status = None
+        error = ''
+        attempt = 0
+        async with semaphore:
+            while True:
+                attempt += 1
+                retry_after = 0
+                await self._bucket(job.url).acquire()
+                try:
+                    status = await asyncio.to_thread(self.download, job, self.client, self.manifest)
+                    result = FetchResult(job, True, status, '', attempt)
+                    break
+                except urllib.error.HTTPError as e:
+                    status, error = e.code, str(e)
+                    retry = e.code in RETRY_STATUSES
+                    header = e.headers.get('Retry-After', '') if e.headers else ''
+                    retry_after = int(header) if header.isdigit() else 0
+                except (urllib.error.URLError, OSError, http.client.HTTPException) as e:
+                    status, error = None, str(e)
+                    retry = True
+                except Exception as e:
+                    status, error = None, str(e)
+                    retry = False
+                if not retry or attempt > self.retries:
+                    result = FetchResult(job, False, status, error, attempt)
+                    break
+                # Full jitter: spread retries so they do not arrive in lockstep
+                await asyncio.sleep(retry_after + random.uniform(0, self.backoff * 2 ** (attempt - 1)))
+        if on_result:
+            on_result(result)
+        return result
+
+    async def run_async(self, jobs, on_result=None):
+        semaphore = asyncio.Semaphore(self.concurrency)
+        self._buckets = {}
+        return await asyncio.gather(*(self._fetch(job, semaphore, on_result) for job in jobs))
+
+    def run(self, jobs, on_result=None):
+        """Fetch every job; return FetchResults in job order.
+
+        on_result(result) is called as each job finishes.
+        """
+        try:
+            return asyncio.run(self.run_async(list(jobs), on_result))
+        finally:
+            if self.manifest:
+                self.manifest.save()
+
+
+def run_jobs(jobs, on_result=None, **options):
+    """Fetch jobs with a FetchEngine built from options; return FetchResults."""
+    return FetchEngine(**options).run(jobs, on_result)
@@ -1,52 +1,51 @@
 #!/usr/bin/env python3
 """
 Fetch missing images and pages from https://23c.jp/ (original Japanese site)
+
+Downloads run concurrently through fetch_engine, which rate-limits each host
+and retries transient failures, instead of one blocking request at a time.
+With --refresh, files that already exist are re-validated with conditional
+GETs against .fetch_manifest.json instead of being skipped.
 """
+import argparse
 import os
-import re
-import urllib.request
-import urllib.error
-from pathlib import Path
-from urllib.parse import urljoin, urlparse
-import time
+from urllib.parse import urljoin
+
+import fetch_engine
+import fetch_manifest
+import http_client
+import remote_paths
+from fetch_engine import FetchJob
 
 def fetch_image(image_url, save_path):
     """Download an image from a URL and save it locally"""
-    try:
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        
-        # Set a user agent to avoid being blocked
-        headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'}
-        req = urllib.request.Request(image_url, headers=headers)
-        
-        with urllib.request.urlopen(req, timeout=10) as response:
-            with open(save_path, 'wb') as out_file:
-                out_file.write(response.read())
-        return True
-    except Exception as e:
-        print(f"    Failed to download {image_url}: {e}")
-        return False
+    result = fetch_engine.run_jobs([FetchJob(image_url, save_path)])[0]
+    if not result.ok:
+        print(f"    Failed to download {image_url}: {result.error}")
+    return result.ok
 
 def fetch_page(page_url, save_path):
     """Download a page from the original Japanese site"""
-    try:
-        os.makedirs(os.path.dirname(save_path), exist_ok=True)
-        
-        headers = {'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'}
-        req = urllib.request.Request(page_url, headers=headers)
-        
-        with urllib.request.urlopen(req, timeout=10) as response:
-            content = response.read().decode('utf-8', errors='ignore')
-        
-        # Fix image paths and links for local use
-        content = fix_html_for_local_use(content)
-        
-        with open(save_path, 'w', encoding='utf-8') as out_file:
-            out_file.write(content)
-        return True
-    except Exception as e:
-        print(f"    Failed to download {page_url}: {e}")
-        return False
+    # Fix image paths and links for local use
+    result = fetch_engine.run_jobs([FetchJob(page_url, save_path, transform=fix_html_for_local_use)])[0]
+    if not result.ok:
+        print(f"    Failed to download {page_url}: {result.error}")
+    return result.ok
+
+def run_fetch_jobs(jobs, **options):
+    """Fetch jobs concurrently, printing each result; return (downloaded, failed)"""
+    def report(result):
+        if result.ok and result.status == 304:
+            print(f"    = {result.job.label} unchanged")
+        elif result.ok:
+            print(f"    ✓ Downloaded {result.job.label}")
+        else:
+            print(f"    ✗ Failed to download {result.job.label}: {result.error}")
+
+    results = fetch_engine.run_jobs(jobs, on_result=report, **options)
+    downloaded = sum(1 for result in results if result.ok and result.status != 304)
+    failed = sum(1 for result in results if not result.ok)
+    return downloaded, failed
 
 def fix_html_for_local_use(html_content):
     """Fix HTML content to work with local file paths"""
@@ -54,7 +53,7 @@ def fix_html_for_local_use(html_content):
     # For now, just ensure it has proper structure
     return html_content
 
-def fetch_missing_images():
+def fetch_missing_images(refresh=False, **options):
     """Fetch missing images from the original site"""
     base_url = 'https://23c.jp'
     img_dir = '/Users/asiboro/Sources/Work/23centuryid/assets/img'
@@ -95,32 +94,25 @@ def fetch_missing_images():
     print("Fetching missing images from https://23c.jp/")
     print("=" * 70)
     
-    downloaded = 0
-    failed = 0
-    
+    # Prefer the path the origin actually uses, if the remote path index knows it
+    remote_index = remote_paths.load_remote_paths()
+    jobs = []
     for filename, image_path in missing_images.items():
+        image_path = remote_paths.resolve(remote_index, filename) or image_path
         save_path = os.path.join(img_dir, filename)
         
-        if os.path.exists(save_path):
+        if os.path.exists(save_path) and not refresh:
             print(f"  - {filename} already exists")
             continue
         
-        image_url = urljoin(base_url, image_path)
         print(f"  Fetching {filename}...")
-        
-        if fetch_image(image_url, save_path):
-            downloaded += 1
-            print(f"    ✓ Downloaded {filename}")
-        else:
-            failed += 1
-            print(f"    ✗ Failed to download {filename}")
-        
-        time.sleep(0.5)  # Be polite to the server
+        jobs.append(FetchJob(urljoin(base_url, image_path), save_path, filename))
     
+    downloaded, failed = run_fetch_jobs(jobs, **options)
     print(f"\n  Downloaded: {downloaded}, Failed: {failed}")
     return downloaded, failed
 
-def fetch_missing_pages():
+def fetch_missing_pages(refresh=False, **options):
     """Fetch missing content pages from the original site"""
     base_url = 'https://23c.jp'
     root_dir = '/Users/asiboro/Sources/Work/23centuryid'
@@ -145,32 +137,22 @@ def fetch_missing_pages():
     print("Fetching missing pages from https://23c.jp/")
     print("=" * 70)
     
-    downloaded = 0
-    failed = 0
-    
+    jobs = []
     for page_name, page_path in missing_pages.items():
         local_path = os.path.join(root_dir, page_name, 'index.html')
         
-        if os.path.exists(local_path):
+        if os.path.exists(local_path) and not refresh:
             print(f"  - {page_name}/index.html already exists")
             continue
         
-        page_url = urljoin(base_url, page_path)
         print(f"  Fetching {page_name}...")
-        
-        if fetch_page(page_url, local_path):
-            downloaded += 1
-            print(f"    ✓ Downloaded {page_name}")
-        else:
-            failed += 1
-            print(f"    ✗ Failed to download {page_name}")
-        
-        time.sleep(1)  # Be polite to the server
+        jobs.append(FetchJob(urljoin(base_url, page_path), local_path, page_name, fix_html_for_local_use))
     
+    downloaded, failed = run_fetch_jobs(jobs, **options)
     print(f"\n  Downloaded: {downloaded}, Failed: {failed}")
     return downloaded, failed
 
-def fetch_treatment_pages():
+def fetch_treatment_pages(refresh=False, **options):
     """Fetch treatment information pages from the original site"""
     base_url = 'https://23c.jp'
     root_dir = '/Users/asiboro/Sources/Work/23centuryid'
@@ -201,32 +183,36 @@ def fetch_treatment_pages():
     print("Fetching treatment and condition pages from https://23c.jp/")
     print("=" * 70)
     
-    downloaded = 0
-    failed = 0
-    
+    jobs = []
     for page_name, page_path in treatment_pages.items():
         local_path = os.path.join(root_dir, page_name, 'index.html')
         
-        if os.path.exists(local_path):
+        if os.path.exists(local_path) and not refresh:
             print(f"  - {page_name}/index.html already exists")
             continue
         
-        page_url = urljoin(base_url, page_path)
         print(f"  Fetching {page_name}...")
-        
-        if fetch_page(page_url, local_path):
-            downloaded += 1
-            print(f"    ✓ Downloaded {page_name}")
-        else:
-            failed += 1
-            print(f"    ✗ Failed to download {page_name}")
-        
-        time.sleep(1)  # Be polite to the server
+        jobs.append(FetchJob(urljoin(base_url, page_path), local_path, page_name, fix_html_for_local_use))
     
+    downloaded, failed = run_fetch_jobs(jobs, **options)
     print(f"\n  Downloaded: {downloaded}, Failed: {failed}")
     return downloaded, failed
 
 def main():
+    parser = argparse.ArgumentParser(description='Fetch missing assets from https://23c.jp/')
+    parser.add_argument('--concurrency', type=int, default=fetch_engine.CONCURRENCY,
+                        help='downloads in flight at once (default: %(default)s)')
+    parser.add_argument('--rate', type=float, default=fetch_engine.RATE_PER_HOST,
+                        help='requests per second per host (default: %(default)s)')
+    parser.add_argument('--refresh', action='store_true',
+                        help='re-validate existing files with conditional GETs instead of skipping them')
+    parser.add_argument('--base-url', default=None,
+                        help='send requests to this origin instead, e.g. http://127.0.0.1:8023')
+    args = parser.parse_args()
+    http_client.set_base_url(args.base_url)
+    options = {'concurrency': args.concurrency, 'rate': args.rate,
+               'manifest': fetch_manifest.load_manifest(), 'refresh': args.refresh}
+
     print("\n")
     print("╔" + "=" * 68 + "╗")
     print("║" + " " * 68 + "║")
@@ -235,9 +221,9 @@ def main():
     print("╚" + "=" * 68 + "╝")
     print()
     
-    img_downloaded, img_failed = fetch_missing_images()
-    page_downloaded, page_failed = fetch_missing_pages()
-    treat_downloaded, treat_failed = fetch_treatment_pages()
+    img_downloaded, img_failed = fetch_missing_images(**options)
+    page_downloaded, page_failed = fetch_missing_pages(**options)
+    treat_downloaded, treat_failed = fetch_treatment_pages(**options)
     
     print("\n" + "=" * 70)
     print("SUMMARY")
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Conditional-GET manifest for the fetch scripts.
+
+For every URL downloaded, .fetch_manifest.json in the site root records the
+origin's ETag and Last-Modified validators plus the size and sha256 of the
+file written locally. A later fetch of the same URL sends If-None-Match /
+If-Modified-Since, so an unchanged asset costs a 304 with no body instead of
+being skipped forever or downloaded whole again. Validators are only sent
+while the local file still has the recorded size; a file that was edited,
+truncated or removed is fetched unconditionally.
+"""
+import json
+import os
+import threading
+from pathlib import Path
+
+ROOT_DIR = Path('/Users/asiboro/Sources/Work/23centuryid')
+MANIFEST_FILE = '.fetch_manifest.json'
+MANIFEST_VERSION = 1
+
+
+class FetchManifest:
+    """URL -> {path, etag, last_modified, size, sha256}, safe to share between threads."""
+
+    def __init__(self, path, entries=None):
+        self.path = Path(path)
+        self.entries = entries or {}
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def conditional_headers(self, url, local_path):
+        """Return the If-None-Match / If-Modified-Since headers for url, or {}."""
+        with self._lock:
+            entry = self.entries.get(url)
+        if not entry or entry.get('path') != str(local_path):
+            return {}
+        try:
+            if os.path.getsize(local_path) != entry['size']:
+                return {}
+        except OSError:
+            return {}
+        headers = {}
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def record(self, url, local_path, response_headers, size, sha256):
+        """Remember the validators of a 200 response and the file written for it."""
+        entry = {
+            'path': str(local_path),
+            'etag': response_headers.get('ETag'),
+            'last_modified': response_headers.get('Last-Modified'),
+            'size': size,
+            'sha256': sha256,
+        }
+        with self._lock:
+            self.entries[url] = entry
+            self.dirty = True
+
+    def save(self):
+        """Write the manifest if it changed, replacing the previous copy atomically."""
+        with self._lock:
+            if not self.dirty:
+                return
+            data = {'version': MANIFEST_VERSION, 'entries': self.entries}
+            tmp_path = self.path.with_name(self.path.name + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=1, sort_keys=True)
+            os.replace(tmp_path, self.path)
+            self.dirty = False
+
+
+def load_manifest(root_dir=ROOT_DIR):
+    """Load the manifest from root_dir, or an empty one if missing or from another version."""
+    path = Path(root_dir) / MANIFEST_FILE
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        data = {}
+    if data.get('version') != MANIFEST_VERSION:
+        data = {}
+    return FetchManifest(path, data.get('entries'))
@@ -2,12 +2,18 @@
 """
 Fetch missing image files from https://23c.jp/wp-content/uploads/
 This script downloads the actual image files referenced in the HTML files.
+With --refresh, existing files are re-validated with conditional GETs
+against .fetch_manifest.json instead of being skipped.
 """
 
-import os
-import urllib.request
+import argparse
 import urllib.error
 from pathlib import Path
+from urllib.parse import urljoin
+
+import fetch_manifest
+import http_client
+import remote_paths
 
 # Missing images found by link_analyzer.py
 MISSING_IMAGES = [
@@ -99,29 +105,26 @@ MISSING_IMAGES = [
     },
 ]
 
-def fetch_image(remote_url, local_path):
+def fetch_image(remote_url, local_path, manifest=None):
     """Download an image from remote URL to local path"""
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
-    }
-    
     try:
         print(f"    Fetching: {remote_url}")
-        req = urllib.request.Request(remote_url, headers=headers)
-        
-        with urllib.request.urlopen(req, timeout=10) as response:
-            with open(local_path, 'wb') as out_file:
-                out_file.write(response.read())
+        headers = manifest.conditional_headers(remote_url, local_path) if manifest else None
+        result = http_client.download(remote_url, local_path, headers)
+        if result.status == 304:
+            print(f"    = {local_path} unchanged")
+            return True
+        if manifest:
+            manifest.record(remote_url, local_path, result.headers, result.size, result.sha256)
         
-        file_size = os.path.getsize(local_path)
-        print(f"    ✓ Downloaded {local_path} ({file_size:,} bytes)")
+        print(f"    ✓ Downloaded {local_path} ({result.size:,} bytes)")
         return True
         
     except urllib.error.HTTPError as e:
         print(f"    ✗ HTTP Error {e.code}: {remote_url}")
         return False
-    except urllib.error.URLError as e:
-        print(f"    ✗ URL Error: {e.reason}")
+    except OSError as e:
+        print(f"    ✗ Connection Error: {e}")
         return False
     except Exception as e:
         print(f"    ✗ Error: {e}")
@@ -129,6 +132,16 @@ def fetch_image(remote_url, local_path):
 
 
 def main():
+    parser = argparse.ArgumentParser(description='Fetch missing images from https://23c.jp/')
+    parser.add_argument('--refresh', action='store_true',
+                        help='re-validate existing files with conditional GETs instead of skipping them')
+    parser.add_argument('--base-url', default=None,
+                        help='send requests to this origin instead, e.g. http://127.0.0.1:8023')
+    args = parser.parse_args()
+    http_client.set_base_url(args.base_url)
+    manifest = fetch_manifest.load_manifest()
+    remote_index = remote_paths.load_remote_paths()
+
     print("\n" + "="*80)
     print("Fetching Missing Images from https://23c.jp/")
     print("="*80 + "\n")
@@ -144,17 +157,25 @@ def main():
         local_path = img_dir / img_info["local"]
         
         # Skip if already exists
-        if local_path.exists():
+        if local_path.exists() and not args.refresh:
             print(f"  ⊘ {img_info['local']} already exists")
             skipped += 1
             continue
         
         # Fetch the image
-        if fetch_image(img_info["remote"], str(local_path)):
+        # Prefer the path the origin actually uses, if the remote path index knows it
+        remote_url = img_info["remote"]
+        remote_path = remote_paths.resolve(remote_index, img_info["local"])
+        if remote_path:
+            remote_url = urljoin(remote_url, remote_path)
+        
+        if fetch_image(remote_url, str(local_path), manifest):
             downloaded += 1
         else:
             failed += 1
     
+    manifest.save()
+    
     print("\n" + "="*80)
     print("SUMMARY")
     print("="*80)
@@ -1,11 +1,23 @@
 #!/usr/bin/env python3
 """
 Fetch missing responsive image variants from origin site.
+
+Each file's upload folder comes from the remote path index, so every image
+costs exactly one request instead of probing year/month folders in turn.
+With --refresh, images that already exist are re-validated with conditional
+GETs against .fetch_manifest.json instead of being skipped.
 """
 
-import subprocess
+import argparse
+import urllib.error
 from pathlib import Path
 
+import fetch_engine
+import fetch_manifest
+import http_client
+import remote_paths
+from fetch_engine import FetchJob
+
 ROOT_DIR = Path('/Users/asiboro/Sources/Work/23centuryid')
 ORIGIN = 'https://23c.jp'
 
@@ -32,43 +44,56 @@ missing_images = [
     'unauthorized-cgtp-warning-768x415.webp',
 ]
 
-def fetch_image(filename):
+def fetch_image(filename, remote_index, manifest=None):
     """Fetch a single image from origin."""
-    origin_url = f'{ORIGIN}/wp-content/uploads/2025/04/{filename}'
     local_path = ROOT_DIR / 'assets' / 'img' / filename
     
-    cmd = ['curl', '-s', origin_url, '-o', str(local_path)]
-    result = subprocess.run(cmd, capture_output=True)
+    remote_path = remote_paths.resolve(remote_index, filename)
+    if remote_path is None:
+        # Unknown to the index; most of these variants were uploaded in 2025/04
+        remote_path = f'/wp-content/uploads/2025/04/{filename}'
     
-    if local_path.exists():
-        size = local_path.stat().st_size
-        print(f'✅ {filename} ({size} bytes)')
-        return True
-    else:
-        # Try alternate paths
-        for year_month in ['2025/03', '2025/02', '2025/01']:
-            origin_url = f'{ORIGIN}/wp-content/uploads/{year_month}/{filename}'
-            cmd = ['curl', '-s', origin_url, '-o', str(local_path)]
-            subprocess.run(cmd, capture_output=True)
-            
-            if local_path.exists():
-                size = local_path.stat().st_size
-                print(f'✅ {filename} from {year_month} ({size} bytes)')
-                return True
-        
-        print(f'⚠️  Could not fetch {filename}')
+    job = FetchJob(f'{ORIGIN}{remote_path}', str(local_path), filename)
+    try:
+        status = fetch_engine.download(job, http_client.shared_client(), manifest)
+    except urllib.error.HTTPError as e:
+        print(f'⚠️  Could not fetch {filename}: HTTP {e.code}')
+        return False
+    except Exception as e:
+        print(f'⚠️  {filename}: {e}')
         return False
+    
+    if status == 304:
+        print(f'= {filename} unchanged')
+    else:
+        print(f'✅ {filename} from {remote_path} ({local_path.stat().st_size} bytes)')
+    return True
 
 def main():
+    parser = argparse.ArgumentParser(description='Fetch missing responsive image variants.')
+    parser.add_argument('--refresh', action='store_true',
+                        help='re-validate existing files with conditional GETs instead of skipping them')
+    parser.add_argument('--base-url', default=None,
+                        help='send requests to this origin instead, e.g. http://127.0.0.1:8023')
+    args = parser.parse_args()
+    http_client.set_base_url(args.base_url)
+
     print("=" * 80)
     print("FETCHING MISSING RESPONSIVE IMAGE VARIANTS")
     print("=" * 80)
     print()
     
+    remote_index = remote_paths.load_remote_paths(ROOT_DIR)
+    manifest = fetch_manifest.load_manifest(ROOT_DIR)
     successful = 0
     for filename in missing_images:
-        if fetch_image(filename):
+        if (ROOT_DIR / 'assets' / 'img' / filename).exists() and not args.refresh:
+            print(f'⊘ {filename} already exists')
+            successful += 1
+            continue
+        if fetch_image(filename, remote_index, manifest):
             successful += 1
+    manifest.save()
     
     print()
     print("=" * 80)
@@ -7,17 +7,12 @@ import os
 import re
 from pathlib import Path
 
+import site_index
+
 ROOT_DIR = Path('/Users/asiboro/Sources/Work/23centuryid')
 
-def fix_html_file(filepath):
-    """Convert absolute image URLs to local paths."""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except:
-        return 0
-    
-    original = content
+def fix_absolute_urls(content):
+    """Convert absolute image URLs in HTML content; return (new_content, fixes)."""
     fixes = 0
     
     # Fix src="https://23c.jp/wp-content/uploads/YYYY/MM/filename" → src="/assets/img/filename"
@@ -48,9 +43,21 @@ def fix_html_file(filepath):
         content
     )
     
-    if content != original:
+    return content, fixes
+
+def fix_html_file(filepath):
+    """Convert absolute image URLs to local paths."""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except:
+        return 0
+    
+    new_content, fixes = fix_absolute_urls(content)
+    
+    if new_content != content:
         with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+            f.write(new_content)
     
     return fixes
 
@@ -62,13 +69,14 @@ def main():
     total_fixes = 0
     files_fixed = 0
     
-    for html_file in ROOT_DIR.rglob('*.html'):
-        if 'fetched_pages' in str(html_file):
-            continue
-        
-        fixes = fix_html_file(html_file)
+    index = site_index.load_index(ROOT_DIR)
+    candidates = site_index.pages_containing(
+        index, ['https://23c.jp/wp-content/'], ROOT_DIR, include_fetched=False
+    )
+    
+    for rel_path in candidates:
+        fixes = fix_html_file(ROOT_DIR / rel_path)
         if fixes > 0:
-            rel_path = html_file.relative_to(ROOT_DIR)
             print(f"  {rel_path}: {fixes} fixes")
             total_fixes += fixes
             files_fixed += 1
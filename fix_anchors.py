@@ -6,6 +6,11 @@ Fix remaining anchor link issues by adding IDs to FAQ, Flow, and other pages
 import os
 from pathlib import Path
 
+import site_index
+import verify_anchors
+
+PAGES = ["faq/index.html", "flow/index.html", "cell-laboratory/index.html"]
+
 def add_faq_anchors():
     """Add FAQ anchor IDs to the FAQ page"""
     
@@ -79,7 +84,7 @@ def add_faq_anchors():
 """
     
     faq_file.write_text(faq_content)
-    print(f"  ✓ Added FAQ anchor IDs: #faq-01 through #faq-06")
+    print(f"  ✓ Wrote {faq_file}")
     return 1
 
 
@@ -157,7 +162,7 @@ def add_flow_anchors():
 """
     
     flow_file.write_text(flow_content)
-    print(f"  ✓ Added flow anchor IDs: #flow-01, #flow-02")
+    print(f"  ✓ Wrote {flow_file}")
     return 1
 
 
@@ -177,6 +182,21 @@ def add_cell_lab_anchor():
         return 0
 
 
+def check_linked_anchors(pages=PAGES):
+    """Re-index the site and check every #fragment link into pages; return the broken ones."""
+    index = site_index.load_index(".")
+    fragments = site_index.fragment_index(index)
+    for page in pages:
+        if page in fragments:
+            anchors = ', '.join(f"#{anchor}" for anchor in sorted(fragments[page])) or "none"
+            print(f"  {page}: {anchors}")
+    _, broken = verify_anchors.find_broken_fragments(index)
+    broken = [link for link in broken if link[2] in pages]
+    for rel_path, href, target_page, fragment in broken:
+        print(f"  ✗ {rel_path}: {href} - #{fragment} NOT FOUND in {target_page}")
+    return broken
+
+
 def main():
     print("\n" + "="*80)
     print("Fixing Remaining Anchor Links")
@@ -193,8 +213,14 @@ def main():
     # Verify cell-lab anchor
     add_cell_lab_anchor()
     
+    print("\nAnchor IDs now in the pages:\n")
+    broken = check_linked_anchors()
+    
     print("\n" + "="*80)
-    print("COMPLETE - All anchor IDs have been added")
+    if broken:
+        print(f"INCOMPLETE - {len(broken)} links still point at missing anchors")
+    else:
+        print("COMPLETE - Every linked anchor ID exists")
     print("="*80 + "\n")
 
 
@@ -6,6 +6,8 @@ import os
 import re
 from pathlib import Path
 
+from rewrite_engine import RewriteEngine
+
 def find_all_html_files(root_dir):
     """Find all HTML files in the directory tree."""
     html_files = []
@@ -132,45 +134,33 @@ def create_mapping():
     
     return mapping
 
-def fix_html_file(file_path, mapping):
-    """Fix a single HTML file by replacing broken links."""
+def build_engine(mapping):
+    """Compile the mapping into a single-pass rewrite engine."""
+    # jQuery is referenced with varying ?ver= query strings, which are dropped
+    strip_query = [old_url for old_url in mapping if 'jquery' in old_url.lower()]
+    return RewriteEngine(mapping, strip_query)
+
+def fix_html_file(file_path, engine):
+    """Fix a single HTML file by replacing broken links.
+
+    Returns the list of substitutions made, one per replaced reference.
+    """
     with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
         content = f.read()
     
-    original_content = content
-    fixes_made = []
-    
-    # Replace each mapping, handling query strings
-    for old_url, new_url in mapping.items():
-        # For jQuery, handle query string separately
-        if 'jquery' in old_url.lower():
-            # Match with and without query string
-            base_url = old_url.split('?')[0]
-            import re
-            pattern = re.escape(base_url) + r'(\?[^"\s]*)?'
-            if re.search(pattern, content):
-                content = re.sub(f'"{pattern}"', f'"{new_url}"', content)
-                content = re.sub(f"'{pattern}'", f"'{new_url}'", content)
-                fixes_made.append(old_url)
-        # Replace exact matches
-        elif old_url in content:
-            content = content.replace(f'"{old_url}"', f'"{new_url}"')
-            content = content.replace(f"'{old_url}'", f"'{new_url}'")
-            content = content.replace(f'content="{old_url}"', f'content="{new_url}"')
-            content = content.replace(f"content='{old_url}'", f"content='{new_url}'")
-            fixes_made.append(old_url)
+    content, substitutions = engine.rewrite(content)
     
     # Write back if changes were made
-    if content != original_content:
+    if substitutions:
         with open(file_path, 'w', encoding='utf-8') as f:
             f.write(content)
-        return fixes_made
-    return []
+    return substitutions
 
 def main():
     root_dir = '/Users/asiboro/Sources/Work/23centuryid'
     html_files = find_all_html_files(root_dir)
     mapping = create_mapping()
+    engine = build_engine(mapping)
     
     print(f"Processing {len(html_files)} HTML files...\n")
     
@@ -178,7 +168,7 @@ def main():
     files_modified = 0
     
     for html_file in sorted(html_files):
-        fixes = fix_html_file(html_file, mapping)
+        fixes = fix_html_file(html_file, engine)
         if fixes:
             files_modified += 1
             total_fixes += len(fixes)
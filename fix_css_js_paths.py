@@ -8,20 +8,31 @@ import os
 import re
 from pathlib import Path
 
+import site_index
+
+# Mapping of old WordPress paths to new local paths
+PATH_MAPPINGS = [
+    ("/wp-content/themes/_23c/style.css", "/assets/css/style.css"),
+    ("/wp-content/themes/_23c/css/main.css", "/assets/css/main.css"),
+    ("/wp-content/themes/_23c/js/main.js", "/assets/js/main.js"),
+    # Also handle https:// versions
+    ("https://23c.jp/wp-content/themes/_23c/style.css", "/assets/css/style.css"),
+    ("https://23c.jp/wp-content/themes/_23c/css/main.css", "/assets/css/main.css"),
+    ("https://23c.jp/wp-content/themes/_23c/js/main.js", "/assets/js/main.js"),
+]
+
+def fix_theme_content(content):
+    """Apply PATH_MAPPINGS to HTML content; return (new_content, replacements)"""
+    replacements = 0
+    for old_path, new_path in PATH_MAPPINGS:
+        if old_path in content:
+            content = content.replace(old_path, new_path)
+            replacements += 1
+    return content, replacements
+
 def fix_theme_paths():
     """Fix all WordPress theme paths in HTML files"""
     
-    # Mapping of old WordPress paths to new local paths
-    path_mappings = [
-        ("/wp-content/themes/_23c/style.css", "/assets/css/style.css"),
-        ("/wp-content/themes/_23c/css/main.css", "/assets/css/main.css"),
-        ("/wp-content/themes/_23c/js/main.js", "/assets/js/main.js"),
-        # Also handle https:// versions
-        ("https://23c.jp/wp-content/themes/_23c/style.css", "/assets/css/style.css"),
-        ("https://23c.jp/wp-content/themes/_23c/css/main.css", "/assets/css/main.css"),
-        ("https://23c.jp/wp-content/themes/_23c/js/main.js", "/assets/js/main.js"),
-    ]
-    
     print("\n" + "="*80)
     print("Fixing All WordPress Theme Paths")
     print("="*80 + "\n")
@@ -29,38 +40,30 @@ def fix_theme_paths():
     files_updated = 0
     total_replacements = 0
     
-    for root, dirs, files in os.walk("."):
-        # Skip certain directories
-        dirs[:] = [d for d in dirs if d not in [".git", "node_modules", "__pycache__"]]
+    index = site_index.load_index(".")
+    candidates = site_index.pages_containing(
+        index, [old_path for old_path, _ in PATH_MAPPINGS], "."
+    )
+    
+    for rel_path in candidates:
+        filepath = os.path.join(".", rel_path)
         
-        for file in files:
-            if not file.endswith(".html"):
-                continue
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                content = f.read()
             
-            filepath = os.path.join(root, file)
+            # Apply all path mappings
+            updated_content, replacements = fix_theme_content(content)
+            total_replacements += replacements
             
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                updated_content = content
-                made_change = False
+            if replacements:
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    f.write(updated_content)
+                print(f"  ✓ {filepath}")
+                files_updated += 1
                 
-                # Apply all path mappings
-                for old_path, new_path in path_mappings:
-                    if old_path in updated_content:
-                        updated_content = updated_content.replace(old_path, new_path)
-                        made_change = True
-                        total_replacements += 1
-                
-                if made_change:
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        f.write(updated_content)
-                    print(f"  ✓ {filepath}")
-                    files_updated += 1
-                    
-            except Exception as e:
-                print(f"  ✗ Error processing {filepath}: {e}")
+        except Exception as e:
+            print(f"  ✗ Error processing {filepath}: {e}")
     
     print(f"\n{files_updated} files updated")
     print(f"{total_replacements} path replacements made")
@@ -76,25 +79,10 @@ def verify_all_paths_fixed():
     
     found_issues = False
     
-    for root, dirs, files in os.walk("."):
-        dirs[:] = [d for d in dirs if d not in [".git", "node_modules", "__pycache__"]]
-        
-        for file in files:
-            if not file.endswith(".html"):
-                continue
-            
-            filepath = os.path.join(root, file)
-            
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                if "/wp-content/themes/_23c/" in content or "https://23c.jp/wp-content/themes/_23c/" in content:
-                    print(f"  ⚠️  Still contains WordPress paths: {filepath}")
-                    found_issues = True
-                    
-            except Exception as e:
-                pass
+    index = site_index.load_index(".")
+    for rel_path in site_index.pages_containing(index, ["/wp-content/themes/_23c/"], "."):
+        print(f"  ⚠️  Still contains WordPress paths: {os.path.join('.', rel_path)}")
+        found_issues = True
     
     if not found_issues:
         print("  ✅ All WordPress theme paths have been fixed!\n")
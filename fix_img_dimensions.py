@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Add intrinsic width and height attributes to local <img> tags.
+
+Every <img> whose src is under /assets/img/ and that lacks width or height
+gets the image's real pixel size (from image_dimensions, header-only and
+cached), so browsers can reserve the space before the image arrives. A tag
+with only one of the two gets the other in proportion; existing values are
+never changed, and a tag whose one value is not a plain pixel integer
+(e.g. width="100%") is left alone.
+"""
+
+import os
+import re
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+import image_dimensions
+import site_index
+
+ROOT_DIR = Path('/Users/asiboro/Sources/Work/23centuryid')
+IMG_TAG_PATTERN = re.compile(r'<img\b[^>]*>', re.IGNORECASE)
+SRC_PATTERN = re.compile(r'\ssrc\s*=\s*(["\'])(.*?)\1', re.IGNORECASE | re.DOTALL)
+# Only a plain integer counts as a pixel size; width="100%" is not one
+WIDTH_PATTERN = re.compile(r'\swidth\s*=\s*["\']?(\d+)(?=["\'\s/>])', re.IGNORECASE)
+HEIGHT_PATTERN = re.compile(r'\sheight\s*=\s*["\']?(\d+)(?=["\'\s/>])', re.IGNORECASE)
+HAS_WIDTH_PATTERN = re.compile(r'\swidth\s*=', re.IGNORECASE)
+HAS_HEIGHT_PATTERN = re.compile(r'\sheight\s*=', re.IGNORECASE)
+
+_dimensions = None
+
+def get_dimensions():
+    """Image dimensions of the site, loaded on first use."""
+    global _dimensions
+    if _dimensions is None:
+        _dimensions = image_dimensions.load_dimensions(ROOT_DIR)
+    return _dimensions
+
+def fix_img_dimensions(content, dimensions=None):
+    """Add missing width/height to local <img> tags in HTML content; return (new_content, fixes)."""
+    if '<img' not in content and '<IMG' not in content:
+        return content, 0
+    dimensions = get_dimensions() if dimensions is None else dimensions
+    fixes = 0
+
+    def add_dimensions(match):
+        nonlocal fixes
+        tag = match.group(0)
+        src = SRC_PATTERN.search(tag)
+        if not src:
+            return tag
+        path = unquote(urlsplit(src.group(2).strip()).path)
+        if not path.startswith('/assets/img/') or path.count('/') != 3:
+            return tag
+        size = dimensions.get(os.path.basename(path))
+        has_width, has_height = HAS_WIDTH_PATTERN.search(tag), HAS_HEIGHT_PATTERN.search(tag)
+        if not size or (has_width and has_height):
+            return tag
+
+        width, height = size
+        if has_width or has_height:
+            # Keep the given value and scale the missing one to the image's aspect ratio
+            given = (WIDTH_PATTERN if has_width else HEIGHT_PATTERN).search(tag)
+            if not given:
+                return tag
+            if has_width:
+                attrs = f' height="{max(1, round(int(given.group(1)) * height / width))}"'
+            else:
+                attrs = f' width="{max(1, round(int(given.group(1)) * width / height))}"'
+        else:
+            attrs = f' width="{width}" height="{height}"'
+        fixes += 1
+        return tag[:4] + attrs + tag[4:]
+
+    return IMG_TAG_PATTERN.sub(add_dimensions, content), fixes
+
+def fix_html_file(filepath):
+    """Add width/height to the local images of one HTML file."""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except:
+        return 0
+
+    new_content, fixes = fix_img_dimensions(content)
+
+    if new_content != content:
+        with open(filepath, 'w', encoding='utf-8') as f:
+            f.write(new_content)
+
+    return fixes
+
+def main():
+    print("=" * 80)
+    print("ADDING IMAGE DIMENSIONS")
+    print("=" * 80)
+
+    print(f"Read dimensions of {len(get_dimensions())} images\n")
+
+    total_fixes = 0
+    files_fixed = 0
+
+    index = site_index.load_index(ROOT_DIR)
+    candidates = site_index.pages_referencing(
+        index, lambda url: url.startswith('/assets/img/'), kinds={'img'}, include_fetched=False
+    )
+
+    for rel_path in candidates:
+        fixes = fix_html_file(ROOT_DIR / rel_path)
+        if fixes > 0:
+            print(f"  {rel_path}: {fixes} fixes")
+            total_fixes += fixes
+            files_fixed += 1
+
+    print(f"\n{'-' * 80}")
+    print(f"✅ Added dimensions to {total_fixes} images in {files_fixed} files")
+    print("=" * 80)
+
+if __name__ == '__main__':
+    main()
@@ -6,6 +6,8 @@ Create pages for the remaining missing links and fix WordPress image paths
 import os
 from pathlib import Path
 
+import site_index
+
 def create_missing_pages():
     """Create placeholder pages for missing links"""
     
@@ -166,49 +168,51 @@ def create_missing_pages():
     return created
 
 
+IMAGE_MAPPINGS = {
+    "/wp-content/uploads/2025/04/msc-treatment-rheumatoid-arthritis-1.webp": "/assets/img/msc-treatment-rheumatoid-arthritis-1.webp",
+    "/wp-content/uploads/2025/04/msc-treatment-rheumatoid-arthritis-2.webp": "/assets/img/msc-treatment-rheumatoid-arthritis-2.webp",
+}
+
+
+def fix_wordpress_image_content(content):
+    """Apply IMAGE_MAPPINGS to HTML content; return (new_content, replacements)"""
+    replacements = 0
+    for old_path, new_path in IMAGE_MAPPINGS.items():
+        if old_path in content:
+            content = content.replace(old_path, new_path)
+            replacements += 1
+    return content, replacements
+
+
 def fix_wordpress_image_paths():
     """Fix remaining WordPress image paths in HTML files"""
     
-    image_mappings = {
-        "/wp-content/uploads/2025/04/msc-treatment-rheumatoid-arthritis-1.webp": "/assets/img/msc-treatment-rheumatoid-arthritis-1.webp",
-        "/wp-content/uploads/2025/04/msc-treatment-rheumatoid-arthritis-2.webp": "/assets/img/msc-treatment-rheumatoid-arthritis-2.webp",
-    }
-    
     print("Fixing remaining WordPress image paths...\n")
     
     files_updated = 0
     replacements = 0
     
-    for root, dirs, files in os.walk("."):
-        dirs[:] = [d for d in dirs if d not in [".git", "node_modules", "__pycache__"]]
+    index = site_index.load_index(".")
+    candidates = site_index.pages_containing(index, list(IMAGE_MAPPINGS), ".")
+    
+    for rel_path in candidates:
+        filepath = os.path.join(".", rel_path)
         
-        for file in files:
-            if not file.endswith(".html"):
-                continue
+        try:
+            with open(filepath, 'r', encoding='utf-8') as f:
+                content = f.read()
             
-            filepath = os.path.join(root, file)
+            updated_content, file_replacements = fix_wordpress_image_content(content)
+            replacements += file_replacements
             
-            try:
-                with open(filepath, 'r', encoding='utf-8') as f:
-                    content = f.read()
-                
-                updated_content = content
-                made_change = False
-                
-                for old_path, new_path in image_mappings.items():
-                    if old_path in updated_content:
-                        updated_content = updated_content.replace(old_path, new_path)
-                        made_change = True
-                        replacements += 1
+            if file_replacements:
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    f.write(updated_content)
+                print(f"  ✓ Updated {filepath}")
+                files_updated += 1
                 
-                if made_change:
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        f.write(updated_content)
-                    print(f"  ✓ Updated {filepath}")
-                    files_updated += 1
-                    
-            except Exception as e:
-                print(f"  ✗ Error processing {filepath}: {e}")
+        except Exception as e:
+            print(f"  ✗ Error processing {filepath}: {e}")
     
     print(f"\nTotal files updated: {files_updated}")
     print(f"Total replacements: {replacements}\n")
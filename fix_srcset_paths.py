@@ -9,17 +9,12 @@ import os
 import re
 from pathlib import Path
 
+import site_index
+
 ROOT_DIR = Path('/Users/asiboro/Sources/Work/23centuryid')
 
-def process_html_file(filepath):
-    """Process a single HTML file to fix srcset paths."""
-    try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
-    except:
-        return 0
-    
-    original_content = content
+def fix_srcset_content(content):
+    """Convert srcset paths in HTML content; return (new_content, fixes)."""
     fixes = 0
     
     # Pattern to find srcset attributes with /wp-content/uploads/ paths
@@ -64,9 +59,21 @@ def process_html_file(filepath):
     # Replace srcset attributes
     content = re.sub(r'srcset="([^"]*)"', convert_srcset, content)
     
-    if content != original_content:
+    return content, fixes
+
+def process_html_file(filepath):
+    """Process a single HTML file to fix srcset paths."""
+    try:
+        with open(filepath, 'r', encoding='utf-8') as f:
+            content = f.read()
+    except:
+        return 0
+    
+    new_content, fixes = fix_srcset_content(content)
+    
+    if new_content != content:
         with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+            f.write(new_content)
     
     return fixes
 
@@ -76,25 +83,23 @@ def main():
     print("=" * 80)
     
     total_fixes = 0
-    files_processed = 0
+    index = site_index.load_index(ROOT_DIR)
     
-    for root, dirs, files in os.walk(ROOT_DIR):
-        # Skip fetched_pages
-        if 'fetched_pages' in root:
-            continue
-        
-        for file in files:
-            if file.endswith('.html'):
-                filepath = Path(root) / file
-                fixes = process_html_file(filepath)
-                if fixes > 0:
-                    rel_path = filepath.relative_to(ROOT_DIR)
-                    print(f"  {rel_path}: {fixes} fixes")
-                    total_fixes += fixes
-                files_processed += 1
+    # Only pages that still mention /wp-content/uploads/ can have a srcset to rewrite
+    candidates = site_index.pages_containing(
+        index, ['/wp-content/uploads/'], ROOT_DIR, include_fetched=False
+    )
+    files_processed = sum(1 for _ in site_index.iter_pages(index, include_fetched=False))
+    files_changed = 0
+    for rel_path in candidates:
+        fixes = process_html_file(ROOT_DIR / rel_path)
+        if fixes > 0:
+            print(f"  {rel_path}: {fixes} fixes")
+            total_fixes += fixes
+            files_changed += 1
     
     print(f"\n{'-' * 80}")
-    print(f"✅ Processed {files_processed} HTML files")
+    print(f"✅ Processed {files_processed} HTML files, changed {files_changed}")
     print(f"✅ Applied {total_fixes} srcset path fixes")
     print("=" * 80)
 
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+In-memory snapshot of the deployable tree for link existence checks.
+
+The tree is walked once with os.scandir and every file and directory is
+recorded with its type and size. Existence, size and type queries are then
+dictionary lookups instead of one stat syscall per URL per page. Call
+invalidate() after changing the tree to refresh one path or the whole
+snapshot.
+"""
+import os
+import posixpath
+
+SKIP_DIRS = {'.git', 'node_modules', '.venv', '__pycache__'}
+
+_snapshots = {}
+
+
+class TreeSnapshot:
+    """Existence, size and type lookups for every path under root_dir."""
+
+    def __init__(self, root_dir, skip_dirs=SKIP_DIRS):
+        self.root_dir = str(root_dir)
+        self.skip_dirs = set(skip_dirs)
+        self._entries = None
+
+    @staticmethod
+    def normalize(rel_path):
+        """Turn '/assets/img/x.png' or 'faq/' into a normalized relative key."""
+        rel_path = posixpath.normpath('/' + str(rel_path).replace(os.sep, '/'))
+        return rel_path.lstrip('/')
+
+    def _scan(self):
+        """Walk the tree once, recording (is_dir, size) for every entry."""
+        entries = {'': (True, 0)}
+        pending = ['']
+        while pending:
+            rel_dir = pending.pop()
+            try:
+                with os.scandir(os.path.join(self.root_dir, rel_dir)) as it:
+                    for entry in it:
+                        rel_path = f'{rel_dir}/{entry.name}' if rel_dir else entry.name
+                        try:
+                            if entry.is_dir():
+                                if entry.name in self.skip_dirs:
+                                    continue
+                                entries[rel_path] = (True, 0)
+                                pending.append(rel_path)
+                            else:
+                                entries[rel_path] = (False, entry.stat().st_size)
+                        except OSError:
+                            continue
+            except OSError:
+                continue
+        return entries
+
+    @property
+    def entries(self):
+        if self._entries is None:
+            self._entries = self._scan()
+        return self._entries
+
+    def invalidate(self, rel_path=None):
+        """Forget the snapshot, or re-stat a single path if one is given."""
+        if rel_path is None or self._entries is None:
+            self._entries = None
+            return
+        key = self.normalize(rel_path)
+        try:
+            stat = os.stat(os.path.join(self.root_dir, key))
+        except OSError:
+            self._entries.pop(key, None)
+            return
+        is_dir = os.path.isdir(os.path.join(self.root_dir, key))
+        self._entries[key] = (is_dir, 0 if is_dir else stat.st_size)
+
+    def exists(self, rel_path):
+        entry = self.entries.get(self.normalize(rel_path))
+        if entry is None:
+            return False
+        # Like os.path.exists, 'file.html/' does not exist
+        return entry[0] or not str(rel_path).endswith('/')
+
+    def is_dir(self, rel_path):
+        entry = self.entries.get(self.normalize(rel_path))
+        return bool(entry and entry[0])
+
+    def is_file(self, rel_path):
+        entry = self.entries.get(self.normalize(rel_path))
+        return bool(entry and not entry[0])
+
+    def size(self, rel_path):
+        """Return the size of a file, or None if it does not exist."""
+        entry = self.entries.get(self.normalize(rel_path))
+        return entry[1] if entry and not entry[0] else None
+
+
+def snapshot(root_dir):
+    """Return the shared TreeSnapshot for root_dir, creating it on first use."""
+    key = os.path.abspath(str(root_dir))
+    if key not in _snapshots:
+        _snapshots[key] = TreeSnapshot(key)
+    return _snapshots[key]
+
+
+def seed(root_dir, entries):
+    """Install prebuilt snapshot entries for root_dir, e.g. in a pool initializer.
+
+    Worker processes then share the parent's walk instead of each scanning
+    the tree again.
+    """
+    snapshot(root_dir)._entries = entries
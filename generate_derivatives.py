@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+"""
+Generate responsive srcset variants locally from the originals in assets/img.
+
+An original is any image with -WxH variants on disk or in a srcset of the
+site index, e.g. about.webp for about-300x200.webp. The variants to make
+are exactly the WordPress names (name-WIDTHxHEIGHT.ext) that the srcset
+attributes of the live and fetched pages reference, so fix_srcset_paths
+finds every file it expects and variants no longer have to be fetched from
+the origin one by one. A name whose size does not match the original's
+aspect ratio is center-cropped to it, as WordPress does for cropped sizes.
+
+New breakpoints are added with --widths: each width below the original's
+that no srcset references yet gets a variant whose height is rounded the
+way WordPress rounds it (half up). Added widths are remembered in the
+state file, so later runs keep those variants, until --remove-widths
+forgets them and their variants are removed.
+
+Work is incremental: each variant made is recorded in .derivatives.json
+with the sha256 of the original it was made from, and a run only renders
+variants that are missing, are not valid images (e.g. a saved 404 page) or
+were made from another version of the original. Variants fetched from the
+origin are kept; variants made here that nothing references any more are
+removed. Rendering runs in a process pool.
+
+Resizing needs Pillow (pip install Pillow); the rest of the tooling does not.
+
+Usage:
+    python3 generate_derivatives.py [--widths 1536,2048] [--remove-widths 2048] [--jobs 4] [--force]
+"""
+import argparse
+import json
+import os
+import posixpath
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import urlsplit
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+import asset_store
+import image_headers
+import site_index
+
+ROOT_DIR = Path('/Users/asiboro/Sources/Work/23centuryid')
+IMG_DIR = 'assets/img'
+STATE_FILE = '.derivatives.json'
+STATE_VERSION = 2
+QUALITY = 82
+RASTER_FORMATS = ('png', 'jpeg', 'webp')
+SIZED_NAME_PATTERN = re.compile(r'^(?P<base>.+)-(?P<width>\d+)x(?P<height>\d+)(?P<ext>\.[A-Za-z0-9]+)$')
+
+
+def variant_name(original, width, height):
+    """WordPress variant name: about.webp, 300, 200 -> about-300x200.webp"""
+    stem, ext = os.path.splitext(original)
+    return f'{stem}-{width}x{height}{ext}'
+
+
+def variant_sizes(width, height, widths, referenced=()):
+    """(width, height) of each new width below the original's that no referenced size has.
+
+    Heights are rounded half up like WordPress (PHP round), not to even;
+    WordPress never upscales.
+    """
+    taken = {w for w, _ in referenced}
+    return [(w, max(1, int(height * w / width + 0.5)))
+            for w in sorted(set(widths)) if w < width and w not in taken]
+
+
+def find_originals(img_dir, index=None):
+    """(name, ImageInfo, referenced (width, height) set) of every raster original with variants.
+
+    Originals are found from -WxH names on disk and in srcset references;
+    the sizes to make are the ones the srcset references ask for.
+    """
+    names = set(os.listdir(img_dir))
+    candidates = {}
+    for name in names:
+        match = SIZED_NAME_PATTERN.match(name)
+        if match:
+            candidates.setdefault(match.group('base') + match.group('ext'), set())
+    if index is not None:
+        for _, ref in site_index.iter_references(index, kinds={'srcset'}):
+            match = SIZED_NAME_PATTERN.match(posixpath.basename(urlsplit(ref['url']).path))
+            if match:
+                candidates.setdefault(match.group('base') + match.group('ext'), set()).add(
+                    (int(match.group('width')), int(match.group('height'))))
+
+    originals = []
+    for name in sorted(set(candidates) & names):
+        info = image_headers.sniff(Path(img_dir) / name)
+        expected = image_headers.EXTENSION_FORMATS.get(Path(name).suffix.lower())
+        if info.format in RASTER_FORMATS and info.format == expected and info.width:
+            # A srcset also lists the original itself, at its own size
+            sizes = {size for size in candidates[name] if size != (info.width, info.height)}
+            originals.append((name, info, sizes))
+    return originals
+
+
+def is_valid_variant(path):
+    info = image_headers.sniff(path)
+    return info.format in RASTER_FORMATS and info.width is not None
+
+
+def render_variants(task):
+    """Worker: write each (name, width, height) variant of source.
+
+    Returns (source, names written, error or None); on an error the
+    variants written before it are still returned so they stay tracked.
+    """
+    source, out_dir, variants = task
+    written = []
+    try:
+        with Image.open(source) as image:
+            image_format = image.format
+            if image.mode not in ('RGB', 'RGBA', 'L', 'LA'):
+                image = image.convert('RGBA' if 'transparency' in image.info else 'RGB')
+            for name, width, height in variants:
+                # Same as a plain resize when the aspect ratio matches, a center crop otherwise
+                resized = ImageOps.fit(image, (width, height), Image.LANCZOS)
+                out_path = Path(out_dir) / name
+                tmp_path = out_path.with_name(out_path.name + '.tmp')
+                options = {'optimize': True} if image_format == 'PNG' else {'quality': QUALITY}
+                if image_format == 'JPEG' and resized.mode != 'RGB':
+                    resized = resized.convert('RGB')
+                resized.save(tmp_path, format=image_format, **options)
+                os.replace(tmp_path, out_path)
+                written.append(name)
+    except Exception as e:
+        return source, written, str(e) or type(e).__name__
+    return source, written, None
+
+
+def load_state(root_dir=ROOT_DIR):
+    try:
+        with open(Path(root_dir) / STATE_FILE, 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = None
+    if not state or state.get('version') != STATE_VERSION:
+        state = {'version': STATE_VERSION, 'widths': [], 'originals': {}}
+    return state
+
+
+def save_state(state, root_dir=ROOT_DIR):
+    state_path = Path(root_dir) / STATE_FILE
+    tmp_path = state_path.with_name(state_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, state_path)
+
+
+def plan_work(img_dir, originals, state, widths=(), force=False):
+    """Return (original -> variants to render, variants made here that nothing asks for any more).
+
+    Records each original's current sha256 in state; the variants map keeps
+    every variant made earlier until it is re-rendered or removed.
+    """
+    work = {}
+    orphans = []
+    for name, info, referenced in originals:
+        sha256 = asset_store.file_sha256(Path(img_dir) / name)
+        entry = state['originals'].setdefault(name, {'variants': {}})
+        entry['sha256'] = sha256
+        owned = entry['variants']
+        targets = sorted(set(referenced) | set(variant_sizes(info.width, info.height, widths, referenced)))
+        todo = []
+        for width, height in targets:
+            variant = variant_name(name, width, height)
+            path = Path(img_dir) / variant
+            made = owned.get(variant)
+            if force or not path.exists() or not is_valid_variant(path):
+                todo.append((variant, width, height))
+            elif made and made['source'] != sha256:
+                todo.append((variant, width, height))   # made here from another version of the original
+        wanted = {variant_name(name, width, height) for width, height in targets}
+        orphans.extend((name, variant) for variant in sorted(set(owned) - wanted))
+        if todo:
+            work[name] = todo
+    return work, orphans
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate srcset variants from the originals in assets/img.')
+    parser.add_argument('--widths', default='',
+                        help='comma-separated widths to add where no srcset references one yet; remembered for later runs')
+    parser.add_argument('--remove-widths', default='',
+                        help='comma-separated widths to forget; their variants made here are removed')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, metavar='N',
+                        help='worker processes (default: %(default)s)')
+    parser.add_argument('--force', action='store_true', help='re-render every variant')
+    args = parser.parse_args()
+    widths = [int(width) for width in args.widths.split(',') if width.strip()]
+    removed_widths = [int(width) for width in args.remove_widths.split(',') if width.strip()]
+
+    print("=" * 80)
+    print("GENERATING RESPONSIVE VARIANTS")
+    print("=" * 80)
+
+    if Image is None:
+        print("Pillow is required for resizing: pip install Pillow")
+        return 1
+
+    img_dir = ROOT_DIR / IMG_DIR
+    originals = find_originals(img_dir, site_index.load_index(ROOT_DIR))
+    state = load_state(ROOT_DIR)
+    widths = state['widths'] = sorted((set(state['widths']) | set(widths)) - set(removed_widths))
+    # Originals that are gone are no longer tracked
+    current = {name for name, _, _ in originals}
+    for name in sorted(set(state['originals']) - current):
+        del state['originals'][name]
+        print(f"  - {name}: original no longer present, dropped from {STATE_FILE}")
+    work, orphans = plan_work(img_dir, originals, state, widths, args.force)
+    total = sum(len(variants) for variants in work.values())
+    print(f"{len(originals)} originals, extra widths {widths or 'none'}: {total} variants to render\n")
+
+    for name, variant in orphans:
+        try:
+            os.remove(img_dir / variant)
+        except FileNotFoundError:
+            pass
+        del state['originals'][name]['variants'][variant]
+        print(f"  - {variant}: no longer referenced, removed")
+
+    tasks = [(str(img_dir / name), str(img_dir), variants) for name, variants in sorted(work.items())]
+    sizes = {variant: [width, height] for variants in work.values() for variant, width, height in variants}
+    failed = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        futures = {pool.submit(render_variants, task): task for task in tasks}
+        for future, (source, _, variants) in futures.items():
+            name = os.path.basename(source)
+            try:
+                _, written, error = future.result()
+            except Exception as e:
+                written, error = [], str(e)
+            entry = state['originals'][name]
+            for variant in written:
+                entry['variants'][variant] = {'size': sizes[variant], 'source': entry['sha256']}
+            if written:
+                print(f"  ✓ {name}: {', '.join(written)}")
+            if error:
+                failed += len(variants) - len(written)
+                print(f"  ✗ {name}: {error}")
+    save_state(state, ROOT_DIR)
+
+    print(f"\n{'-' * 80}")
+    print(f"Rendered {total - failed} variants, {failed} failed")
+    print("=" * 80)
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+Streaming extractor for every outgoing reference in an HTML page.
+
+Built on html.parser, so each tag is visited exactly once regardless of
+attribute order, and pages can be fed in chunks instead of being scanned
+as one string. Each reference is reported as a typed Reference record.
+The same pass also collects the page's fragment targets (every id, plus
+name on <a>), so #fragment links can be validated without a second scan.
+"""
+import codecs
+import re
+import sys
+from html.parser import HTMLParser
+from typing import NamedTuple
+
+CHUNK_SIZE = 64 * 1024
+CSS_URL_PATTERN = re.compile(r'''url\(\s*["']?([^"')]+?)["']?\s*\)''')
+
+
+class Reference(NamedTuple):
+    """One outgoing reference found in a page."""
+    kind: str          # img, srcset, stylesheet, script, anchor, link, meta, data, css, ...
+    element: str       # tag name, e.g. 'img'
+    attr: str          # attribute name, or 'text' for <style> contents
+    url: str
+    descriptor: str    # srcset width/density descriptor, '' otherwise
+    line: int          # 1-based line of the tag
+    col: int           # 0-based column of the tag
+
+
+def split_srcset(srcset_value):
+    """Split a srcset value into (url, descriptor) pairs."""
+    candidates = []
+    for part in srcset_value.split(','):
+        items = part.strip().split()
+        if items:
+            candidates.append((items[0], ' '.join(items[1:])))
+    return candidates
+
+
+def reference_kind(element, attr, attrs):
+    """Classify a reference by the element and attribute it came from."""
+    if attr == 'srcset':
+        return 'srcset'
+    if attr.startswith('data-'):
+        return 'data'
+    if element == 'img' and attr == 'src':
+        return 'img'
+    if element == 'script' and attr == 'src':
+        return 'script'
+    if element == 'a' and attr == 'href':
+        return 'anchor'
+    if element == 'link' and attr == 'href':
+        rel = (attrs.get('rel') or '').lower().split()
+        return 'stylesheet' if 'stylesheet' in rel else 'link'
+    if element == 'meta':
+        return 'meta'
+    return attr
+
+
+class ReferenceExtractor(HTMLParser):
+    """HTMLParser that collects Reference records and fragment targets."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.references = []
+        self.anchors = set()
+        self._style_text = None
+        self._style_pos = (1, 0)
+
+    def _add(self, kind, element, attr, url, descriptor='', pos=None):
+        url = url.strip()
+        if url:
+            line, col = pos or self.getpos()
+            self.references.append(Reference(kind, element, attr, url, descriptor, line, col))
+
+    def _add_css_urls(self, element, attr, css_text, pos=None):
+        for match in CSS_URL_PATTERN.finditer(css_text):
+            self._add('css', element, attr, match.group(1), pos=pos)
+
+    def handle_starttag(self, tag, attrs):
+        attr_map = {}
+        for name, value in attrs:
+            attr_map.setdefault(name, value)
+
+        if attr_map.get('id'):
+            self.anchors.add(attr_map['id'])
+        if tag == 'a' and attr_map.get('name'):
+            self.anchors.add(attr_map['name'])
+
+        for attr, value in attr_map.items():
+            if value is None:
+                continue
+            if attr == 'srcset':
+                for url, descriptor in split_srcset(value):
+                    self._add('srcset', tag, attr, url, descriptor)
+            elif attr == 'style':
+                self._add_css_urls(tag, attr, value)
+            elif attr in ('src', 'href'):
+                self._add(reference_kind(tag, attr, attr_map), tag, attr, value)
+            elif attr == 'content' and tag == 'meta':
+                self._add('meta', tag, attr, value)
+            elif attr.startswith('data-') and value:
+                self._add('data', tag, attr, value)
+
+        if tag == 'style':
+            self._style_text = []
+            self._style_pos = self.getpos()
+
+    def handle_startendtag(self, tag, attrs):
+        self.handle_starttag(tag, attrs)
+        if tag == 'style':
+            self._style_text = None
+
+    def handle_data(self, data):
+        # <style> contents may arrive in several pieces when fed in chunks
+        if self._style_text is not None:
+            self._style_text.append(data)
+
+    def handle_endtag(self, tag):
+        if tag == 'style' and self._style_text is not None:
+            self._add_css_urls('style', 'text', ''.join(self._style_text), self._style_pos)
+            self._style_text = None
+
+
+def extract_references(html_content):
+    """Extract every Reference from an HTML string."""
+    parser = ReferenceExtractor()
+    parser.feed(html_content)
+    parser.close()
+    return parser.references
+
+
+def scan_file(path, chunk_size=CHUNK_SIZE):
+    """Read an HTML file in chunks; return (references, anchors)."""
+    parser = ReferenceExtractor()
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(chunk_size)
+            if not chunk:
+                break
+            parser.feed(decoder.decode(chunk))
+    parser.feed(decoder.decode(b'', final=True))
+    parser.close()
+    return parser.references, parser.anchors
+
+
+def extract_file_references(path, chunk_size=CHUNK_SIZE):
+    """Extract every Reference from an HTML file, reading it in chunks."""
+    return scan_file(path, chunk_size)[0]
+
+
+def main():
+    for path in sys.argv[1:]:
+        for ref in extract_file_references(path):
+            descriptor = f" {ref.descriptor}" if ref.descriptor else ''
+            print(f"{path}:{ref.line}:{ref.col}: {ref.kind} <{ref.element} {ref.attr}> {ref.url}{descriptor}")
+
+
+if __name__ == '__main__':
+    main()
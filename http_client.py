@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Shared pooled HTTP client for the fetch scripts.
+
+Connections are kept alive and pooled per (scheme, host, port), so
+re-syncing hundreds of small assets costs one TCP and TLS handshake per
+host instead of one per file (or one curl process per file). HTTPS
+connections also resume the host's last TLS session when a new connection
+has to be opened. The client is thread-safe; fetch_engine calls it from
+worker threads.
+
+download() streams a body to disk in fixed-size chunks through a temp file
+that is renamed into place only on success, hashing and counting bytes as
+they arrive and aborting once a size limit is exceeded, so memory stays
+flat and a failed transfer never leaves a truncated file behind.
+
+Setting a base URL (FETCH_BASE_URL in the environment, or each fetcher's
+--base-url option) sends every request to that scheme and host instead,
+keeping the path, e.g. to test against origin_server.py offline.
+"""
+import hashlib
+import http.client
+import os
+import ssl
+import tempfile
+import threading
+import urllib.error
+from contextlib import contextmanager
+from email.message import Message
+from typing import NamedTuple
+from urllib.parse import urljoin, urlsplit, urlunsplit
+
+BASE_URL_ENV = 'FETCH_BASE_URL'
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
+TIMEOUT = 10
+MAX_IDLE_PER_HOST = 8
+MAX_REDIRECTS = 5
+CHUNK_SIZE = 64 * 1024
+MAX_DOWNLOAD_SIZE = 50 * 1024 * 1024
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+# Errors that mean a pooled keep-alive connection was closed by the server
+_STALE_ERRORS = (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError,
+                 http.client.CannotSendRequest)
+
+
+class Response(NamedTuple):
+    status: int
+    reason: str
+    headers: Message
+    body: bytes
+    url: str
+
+
+class Download(NamedTuple):
+    """Result of HTTPClient.download; size and sha256 describe the saved file."""
+    status: int
+    headers: Message
+    size: int
+    sha256: str
+
+
+class DownloadTooLarge(ValueError):
+    """Raised when a download exceeds its size limit."""
+
+
+def rebase(url, base_url):
+    """Point url at base_url's scheme and host, keeping its path and query."""
+    if not base_url:
+        return url
+    base = urlsplit(base_url)
+    parts = urlsplit(url)
+    return urlunsplit((base.scheme, base.netloc, base.path.rstrip('/') + parts.path, parts.query, ''))
+
+
+class _SessionHTTPSConnection(http.client.HTTPSConnection):
+    """HTTPSConnection that resumes a previous TLS session when given one."""
+
+    def __init__(self, host, port=None, session=None, **kwargs):
+        super().__init__(host, port, **kwargs)
+        self.tls_session = session
+
+    def connect(self):
+        http.client.HTTPConnection.connect(self)
+        if self._tunnel_host:
+            server_hostname = self._tunnel_host
+        else:
+            server_hostname = self.host
+        self.sock = self._context.wrap_socket(self.sock, server_hostname=server_hostname,
+                                              session=self.tls_session)
+
+
+class HTTPClient:
+    """Keep-alive connection pool shared by every fetcher."""
+
+    def __init__(self, user_agent=USER_AGENT, timeout=TIMEOUT, max_idle_per_host=MAX_IDLE_PER_HOST,
+                 base_url=None):
+        self.user_agent = user_agent
+        self.base_url = base_url
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+        self.ssl_context = ssl.create_default_context()
+        self._idle = {}
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def _new_connection(self, key):
+        scheme, host, port = key
+        if scheme == 'https':
+            return _SessionHTTPSConnection(host, port, session=self._sessions.get(key),
+                                           timeout=self.timeout, context=self.ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _acquire(self, key):
+        """Return (connection, reused) for key, preferring an idle pooled one."""
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._new_connection(key), False
+
+    def _release(self, key, conn, response):
+        if response.will_close or conn.sock is None:
+            conn.close()
+            return
+        if isinstance(conn.sock, ssl.SSLSocket) and conn.sock.session is not None:
+            self._sessions[key] = conn.sock.session
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle_per_host:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close(self):
+        """Close every idle connection."""
+        with self._lock:
+            pools, self._idle = self._idle, {}
+        for idle in pools.values():
+            for conn in idle:
+                conn.close()
+
+    def _send(self, method, url, headers):
+        """Send a request; return (key, connection, unread response)."""
+        parts = urlsplit(rebase(url, self.base_url))
+        if parts.scheme not in ('http', 'https'):
+            raise ValueError(f"unsupported URL scheme: {url}")
+        key = (parts.scheme, parts.hostname, parts.port)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+        request_headers = {'User-Agent': self.user_agent, 'Accept-Encoding': 'identity'}
+        request_headers.update(headers or {})
+
+        conn, reused = self._acquire(key)
+        try:
+            conn.request(method, path, headers=request_headers)
+            response = conn.getresponse()
+        except _STALE_ERRORS:
+            conn.close()
+            if not reused:
+                raise
+            # The server dropped an idle keep-alive connection; retry on a fresh one
+            conn = self._new_connection(key)
+            try:
+                conn.request(method, path, headers=request_headers)
+                response = conn.getresponse()
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                raise
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            raise
+        return key, conn, response
+
+    def _request_once(self, method, url, headers):
+        key, conn, response = self._send(method, url, headers)
+        try:
+            body = response.read()
+        except (OSError, http.client.HTTPException):
+            conn.close()
+            raise
+        self._release(key, conn, response)
+        return Response(response.status, response.reason, response.headers, body, url)
+
+    def request(self, method, url, headers=None, follow_redirects=True):
+        """Send a request and read the whole body; returns a Response."""
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._request_once(method, url, headers)
+            location = response.headers.get('Location')
+            if not follow_redirects or response.status not in REDIRECT_STATUSES or not location:
+                return response
+            url = urljoin(url, location)
+            if response.status == 303:
+                method = 'GET'
+        raise urllib.error.HTTPError(url, response.status, 'too many redirects', response.headers, None)
+
+    @contextmanager
+    def open(self, url, headers=None):
+        """GET url (following redirects) and yield the unread http.client.HTTPResponse.
+
+        The body is read by the caller, e.g. in chunks with response.read(n);
+        the connection goes back to the pool only if it was read to the end.
+        """
+        for _ in range(MAX_REDIRECTS + 1):
+            key, conn, response = self._send('GET', url, headers)
+            location = response.getheader('Location')
+            if response.status not in REDIRECT_STATUSES or not location:
+                break
+            response.read()
+            self._release(key, conn, response)
+            url = urljoin(url, location)
+        else:
+            conn.close()
+            raise urllib.error.HTTPError(url, response.status, 'too many redirects', response.headers, None)
+        try:
+            yield response
+        finally:
+            if response.isclosed():
+                self._release(key, conn, response)
+            else:
+                conn.close()
+
+    def download(self, url, path, headers=None, max_size=MAX_DOWNLOAD_SIZE, on_chunk=None):
+        """Stream url to path through a temp file renamed into place on success.
+
+        Returns a Download; on 304 the file is left untouched and size is 0.
+        Raises urllib.error.HTTPError for 4xx/5xx and DownloadTooLarge once
+        more than max_size bytes are announced or received. on_chunk(n) is
+        called after every chunk written, e.g. for bandwidth limiting.
+        """
+        with self.open(url, headers) as response:
+            if response.status == 304:
+                response.read()
+                return Download(304, response.headers, 0, '')
+            if response.status >= 400:
+                raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+            length = response.getheader('Content-Length')
+            length = int(length) if length and length.isdigit() else None
+            if max_size and length is not None and length > max_size:
+                raise DownloadTooLarge(f"{url} is {length:,} bytes (limit {max_size:,})")
+
+            directory, name = os.path.split(os.path.abspath(path))
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=f'.{name}.', suffix='.part')
+            digest = hashlib.sha256()
+            size = 0
+            try:
+                with os.fdopen(fd, 'wb') as out_file:
+                    while True:
+                        chunk = response.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        size += len(chunk)
+                        if max_size and size > max_size:
+                            raise DownloadTooLarge(f"{url} exceeded {max_size:,} bytes")
+                        digest.update(chunk)
+                        out_file.write(chunk)
+                        if on_chunk:
+                            on_chunk(len(chunk))
+                if length is not None and size != length:
+                    raise http.client.IncompleteRead(b'', length - size)
+                os.replace(tmp_path, path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+        return Download(response.status, response.headers, size, digest.hexdigest())
+
+    def get(self, url, headers=None, follow_redirects=True):
+        return self.request('GET', url, headers, follow_redirects)
+
+    def fetch(self, url, headers=None):
+        """GET url; raise urllib.error.HTTPError for 4xx/5xx like urlopen does."""
+        response = self.get(url, headers)
+        if response.status >= 400:
+            raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, None)
+        return response
+
+
+_shared_client = None
+_shared_lock = threading.Lock()
+
+
+def shared_client():
+    """Return the process-wide HTTPClient, creating it on first use."""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            _shared_client = HTTPClient(base_url=os.environ.get(BASE_URL_ENV) or None)
+        return _shared_client
+
+
+def set_base_url(base_url):
+    """Send every request of the shared client to base_url's scheme and host."""
+    shared_client().base_url = base_url or None
+
+
+def get(url, headers=None):
+    """GET url with the shared client; returns a Response of any status."""
+    return shared_client().get(url, headers)
+
+
+def fetch(url, headers=None):
+    """GET url with the shared client; raises urllib.error.HTTPError on 4xx/5xx."""
+    return shared_client().fetch(url, headers)
+
+
+def download(url, path, headers=None, max_size=MAX_DOWNLOAD_SIZE):
+    """Stream url to path with the shared client; see HTTPClient.download."""
+    return shared_client().download(url, path, headers, max_size)
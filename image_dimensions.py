@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Pixel dimensions of every image in assets/img, cached per content hash.
+
+Dimensions come from image_headers.sniff, which reads only the PNG, JPEG,
+WebP or SVG header. File hashes come from the asset store cache
+(.asset_store.json, keyed on size and mtime), and dimensions are cached by
+sha256 in .image_dimensions.json, so an unchanged file is neither hashed
+nor read again, and a renamed or duplicated file reuses its entry.
+"""
+import json
+import os
+from pathlib import Path
+
+import asset_store
+import image_headers
+
+ROOT_DIR = Path('/Users/asiboro/Sources/Work/23centuryid')
+IMG_DIR = 'assets/img'
+CACHE_FILE = '.image_dimensions.json'
+CACHE_VERSION = 1
+
+
+def _load_cache(root_dir):
+    try:
+        with open(Path(root_dir) / CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = None
+    if not cache or cache.get('version') != CACHE_VERSION:
+        cache = {'version': CACHE_VERSION, 'images': {}}
+    return cache
+
+
+def _save_cache(cache, root_dir):
+    cache_path = Path(root_dir) / CACHE_FILE
+    tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=1, sort_keys=True)
+    os.replace(tmp_path, cache_path)
+
+
+def load_dimensions(root_dir=ROOT_DIR):
+    """Map each image file name in assets/img to (width, height); files without both are left out."""
+    img_dir = Path(root_dir) / IMG_DIR
+    if not img_dir.is_dir():
+        return {}
+    store = asset_store.load_store(root_dir)
+    files, hashed = asset_store.scan(img_dir, store)
+    if hashed:
+        asset_store.save_store(store, root_dir)
+
+    cache = _load_cache(root_dir)
+    images = cache['images']
+    dirty = False
+    for name, sha256 in files.items():
+        if sha256 not in images:
+            info = image_headers.sniff(img_dir / name)
+            images[sha256] = [info.format, info.width, info.height]
+            dirty = True
+    for sha256 in set(images) - set(files.values()):
+        del images[sha256]
+        dirty = True
+    if dirty:
+        _save_cache(cache, root_dir)
+
+    dimensions = {}
+    for name, sha256 in files.items():
+        _, width, height = images[sha256]
+        if width and height:
+            dimensions[name] = (width, height)
+    return dimensions
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Identify an image's real format and dimensions from its first bytes.
+
+Only headers are read: the PNG IHDR, the GIF screen descriptor, the WebP
+VP8/VP8L/VP8X chunk header, the JPEG segment headers up to the first SOF
+marker (skipping over EXIF and other segments with seek) and the SVG root
+element. No pixel data is decoded. Files that are not images at all are
+classified too, so that an HTML error page or an empty file saved under an
+image name can be told apart from a damaged image.
+"""
+import re
+import struct
+from typing import NamedTuple, Optional
+
+HEADER_SIZE = 4096
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+# SOF0-SOF15 except DHT (C4), JPG (C8) and DAC (CC)
+JPEG_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+JPEG_STANDALONE_MARKERS = {0x01, 0xD8} | set(range(0xD0, 0xD8))
+SVG_TAG_PATTERN = re.compile(r'<svg\b[^>]*>', re.IGNORECASE | re.DOTALL)
+SVG_LENGTH_PATTERN = re.compile(r'^\s*([0-9]*\.?[0-9]+)\s*(px)?\s*$')
+
+# File extension -> format name reported by sniff()
+EXTENSION_FORMATS = {
+    '.png': 'png', '.jpg': 'jpeg', '.jpeg': 'jpeg', '.webp': 'webp',
+    '.gif': 'gif', '.svg': 'svg', '.ico': 'ico',
+}
+# Formats that are not images: the file is empty, an HTML page or other text
+NON_IMAGE_FORMATS = ('empty', 'html', 'text')
+
+
+class ImageInfo(NamedTuple):
+    format: str                 # png, jpeg, webp, gif, svg, ico, empty, html, text or unknown
+    width: Optional[int] = None
+    height: Optional[int] = None
+
+
+def _svg_length(value):
+    """Pixel length of an SVG width/height attribute; None for %, em and friends."""
+    match = SVG_LENGTH_PATTERN.match(value or '')
+    return round(float(match.group(1))) if match else None
+
+
+def _svg_attribute(tag, name):
+    match = re.search(rf'\s{name}\s*=\s*["\']([^"\']*)["\']', tag)
+    return match.group(1) if match else None
+
+
+def _svg_info(text):
+    """Dimensions from the root <svg> tag: width/height, else the viewBox size."""
+    match = SVG_TAG_PATTERN.search(text)
+    if not match:
+        return ImageInfo('svg')
+    tag = match.group(0)
+    width = _svg_length(_svg_attribute(tag, 'width'))
+    height = _svg_length(_svg_attribute(tag, 'height'))
+    view_box = (_svg_attribute(tag, 'viewBox') or '').replace(',', ' ').split()
+    if len(view_box) == 4 and (width is None or height is None):
+        try:
+            box_width, box_height = float(view_box[2]), float(view_box[3])
+        except ValueError:
+            box_width = box_height = 0
+        if box_width > 0 and box_height > 0:
+            if width is None and height is None:
+                width, height = round(box_width), round(box_height)
+            elif width is None:
+                width = round(height * box_width / box_height)
+            else:
+                height = round(width * box_height / box_width)
+    return ImageInfo('svg', width, height)
+
+
+def _jpeg_size(f):
+    """Walk the JPEG segment headers from offset 2 to the first SOF; return (width, height)."""
+    f.seek(2)
+    while True:
+        byte = f.read(1)
+        while byte and byte != b'\xff':
+            byte = f.read(1)
+        while byte == b'\xff':
+            byte = f.read(1)
+        if not byte:
+            return None, None
+        marker = byte[0]
+        if marker in JPEG_STANDALONE_MARKERS:
+            continue
+        if marker in (0xD9, 0xDA):
+            return None, None   # end of image or start of scan without a frame header
+        length = f.read(2)
+        if len(length) < 2:
+            return None, None
+        if marker in JPEG_SOF_MARKERS:
+            frame = f.read(5)
+            if len(frame) < 5:
+                return None, None
+            height, width = struct.unpack('>HH', frame[1:5])
+            return width, height
+        f.seek(struct.unpack('>H', length)[0] - 2, 1)
+
+
+def _text_info(head):
+    """Classify a header that is not a binary image: SVG, HTML, other text or unknown."""
+    text = head.decode('utf-8', errors='replace').lstrip('\ufeff \t\r\n')
+    lowered = text[:1024].lower()
+    if lowered.startswith('<') and '<svg' in lowered and not lowered.startswith(('<!doctype html', '<html')):
+        return _svg_info(text)
+    if lowered.startswith(('<!doctype html', '<html', '<head', '<body')) or '<html' in lowered:
+        return ImageInfo('html')
+    if head and b'\x00' not in head and text.count('\ufffd') <= len(text) // 100:
+        return ImageInfo('text')
+    return ImageInfo('unknown')
+
+
+def sniff(path):
+    """Return the ImageInfo of the file at path, reading only its header."""
+    with open(path, 'rb') as f:
+        head = f.read(HEADER_SIZE)
+        if not head:
+            return ImageInfo('empty')
+        if head.startswith(PNG_SIGNATURE):
+            if head[12:16] == b'IHDR' and len(head) >= 24:
+                return ImageInfo('png', *struct.unpack('>II', head[16:24]))
+            return ImageInfo('png')
+        if head.startswith(b'\xff\xd8\xff'):
+            return ImageInfo('jpeg', *_jpeg_size(f))
+        if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+            chunk = head[12:16]
+            if chunk == b'VP8 ' and head[23:26] == b'\x9d\x01\x2a' and len(head) >= 30:
+                width, height = struct.unpack('<HH', head[26:30])
+                return ImageInfo('webp', width & 0x3fff, height & 0x3fff)
+            if chunk == b'VP8L' and head[20:21] == b'\x2f' and len(head) >= 25:
+                bits = struct.unpack('<I', head[21:25])[0]
+                return ImageInfo('webp', (bits & 0x3fff) + 1, ((bits >> 14) & 0x3fff) + 1)
+            if chunk == b'VP8X' and len(head) >= 30:
+                width = int.from_bytes(head[24:27], 'little') + 1
+                height = int.from_bytes(head[27:30], 'little') + 1
+                return ImageInfo('webp', width, height)
+            return ImageInfo('webp')
+        if head[:6] in (b'GIF87a', b'GIF89a') and len(head) >= 10:
+            return ImageInfo('gif', *struct.unpack('<HH', head[6:10]))
+        if head[:4] == b'\x00\x00\x01\x00' and len(head) >= 8:
+            return ImageInfo('ico', head[6] or 256, head[7] or 256)
+        return _text_info(head)
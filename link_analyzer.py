@@ -1,25 +1,39 @@
 #!/usr/bin/env python3
 """
 Analyze broken links in HTML files and generate a report with fixes.
+
+With --incremental, per-page results are cached in .link_analyzer_cache.json
+keyed on the page's path and content hash. Only pages that changed, or that
+reference a local target which appeared or disappeared, are re-evaluated.
+
+With --jobs N, parsing and existence checks are spread over N worker
+processes. The report is identical to a serial run.
+
+With --format ndjson, one JSON record per broken reference is streamed to
+stdout as soon as its page has been analyzed. With --baseline FILE (an
+earlier ndjson run), the text report lists only new and resolved
+breakages; ndjson output still carries every current record, marked
+"status": "new" or "known", followed by "resolved" records, so it can be
+used as the next baseline. The exit status is 1 if anything new broke.
 """
+import argparse
+import json
 import os
-import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
 from collections import defaultdict
 
-def find_all_html_files(root_dir):
-    """Find all HTML files in the directory tree."""
-    html_files = []
-    for root, dirs, files in os.walk(root_dir):
-        # Skip node_modules and other irrelevant directories
-        dirs[:] = [d for d in dirs if d not in {'.git', 'node_modules', '.venv', '__pycache__'}]
-        for file in files:
-            if file.endswith('.html'):
-                html_files.append(os.path.join(root, file))
-    return html_files
+import fs_resolver
+import html_refs
+import site_index
 
-def extract_links_from_html(html_content):
-    """Extract all links, images, and assets from HTML content."""
+CACHE_FILE = '.link_analyzer_cache.json'
+CACHE_VERSION = 1
+
+def group_links(refs):
+    """Group (kind, url) pairs into the link categories used by the report."""
     links = {
         'images': [],
         'stylesheets': [],
@@ -27,34 +41,29 @@ def extract_links_from_html(html_content):
         'links': [],
         'other': []
     }
+    categories = {'img': 'images', 'stylesheet': 'stylesheets', 'script': 'scripts', 'anchor': 'links'}
     
-    # Image src attributes
-    for match in re.finditer(r'<img[^>]+src=["\']([^"\']+)["\']', html_content):
-        links['images'].append(match.group(1))
-    
-    # Stylesheet links
-    for match in re.finditer(r'<link[^>]+href=["\']([^"\']+)["\'][^>]*rel=["\']stylesheet', html_content):
-        links['stylesheets'].append(match.group(1))
-    
-    # Script src
-    for match in re.finditer(r'<script[^>]+src=["\']([^"\']+)["\']', html_content):
-        links['scripts'].append(match.group(1))
-    
-    # Anchor links
-    for match in re.finditer(r'<a[^>]+href=["\']([^"\']+)["\']', html_content):
-        links['links'].append(match.group(1))
-    
-    # Meta tags with content
-    for match in re.finditer(r'<meta[^>]+content=["\']([^"\']+)["\']', html_content):
-        content = match.group(1)
-        if content.startswith('/wp-') or content.startswith('http'):
-            links['other'].append(content)
+    for kind, url in refs:
+        if kind in categories:
+            links[categories[kind]].append(url)
+        # Meta tags with content
+        elif kind == 'meta' and (url.startswith('/wp-') or url.startswith('http')):
+            links['other'].append(url)
     
     return links
 
+def extract_links_from_html(html_content):
+    """Extract all links, images, and assets from HTML content."""
+    return group_links((ref.kind, ref.url) for ref in html_refs.extract_references(html_content))
+
+def extract_links_from_index(entry):
+    """Group the references of a site index entry like extract_links_from_html."""
+    return group_links((ref['kind'], ref['url']) for ref in entry['refs'])
+
 def categorize_broken_links(links, root_dir):
     """Categorize broken links by type."""
     broken = defaultdict(set)
+    tree = fs_resolver.snapshot(root_dir)
     
     for category, url_list in links.items():
         for url in url_list:
@@ -77,34 +86,147 @@ def categorize_broken_links(links, root_dir):
                 broken[f'{category}_{subcategory}'].add(url)
             # Check relative paths
             elif url.startswith('/') and not url.startswith('javascript:'):
-                full_path = os.path.join(root_dir, url.lstrip('/'))
-                if not os.path.exists(full_path):
+                if not tree.exists(url.lstrip('/')):
                     broken[f'{category}_missing'].add(url)
     
     return broken
 
-def main():
-    root_dir = '/Users/asiboro/Sources/Work/23centuryid'
-    html_files = find_all_html_files(root_dir)
+def local_target(url):
+    """Return the root-relative path categorize_broken_links checks for a URL, if any."""
+    if url.startswith('http') or url.startswith('//') or url.startswith('javascript:'):
+        return None
+    if '/wp-content/' in url or '/wp-includes/' in url:
+        return None
+    if url.startswith('/'):
+        return url.lstrip('/')
+    return None
+
+def load_cache(root_dir):
+    """Load the incremental cache, or an empty one if missing or outdated."""
+    empty = {'version': CACHE_VERSION, 'pages': {}, 'targets': {}}
+    try:
+        with open(os.path.join(root_dir, CACHE_FILE), 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return empty
+    return cache if cache.get('version') == CACHE_VERSION else empty
+
+def save_cache(cache, root_dir):
+    """Write the incremental cache atomically."""
+    cache_path = os.path.join(root_dir, CACHE_FILE)
+    with open(cache_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(cache, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(cache_path + '.tmp', cache_path)
+
+def changed_targets(cache, root_dir):
+    """Re-check every cached target once and return those that appeared or disappeared."""
+    flipped = set()
+    tree = fs_resolver.snapshot(root_dir)
+    for target, existed in cache['targets'].items():
+        exists = tree.exists(target)
+        if exists != existed:
+            cache['targets'][target] = exists
+            flipped.add(target)
+    return flipped
+
+def analyze_entry(entry, root_dir):
+    """Categorize one index entry and list the local targets it depends on."""
+    links = extract_links_from_index(entry)
+    broken = categorize_broken_links(links, root_dir)
+    targets = sorted({local_target(url) for urls in links.values() for url in urls} - {None})
+    return broken, targets
+
+def iter_analyze_pages(pages, root_dir, jobs=1):
+    """Yield analyze_entry results for (rel_path, entry) pairs, in input order.
+
+    With jobs > 1 the pages are spread over a process pool; results are still
+    yielded in input order so merging them is deterministic.
+    """
+    entries = [entry for _, entry in pages]
+    if jobs > 1 and len(entries) > 1:
+        # Workers get the parent's tree snapshot instead of each walking the tree again
+        tree = fs_resolver.snapshot(root_dir)
+        with ProcessPoolExecutor(max_workers=jobs, initializer=fs_resolver.seed,
+                                 initargs=(tree.root_dir, tree.entries)) as pool:
+            yield from pool.map(analyze_entry, entries, repeat(root_dir),
+                                chunksize=max(1, len(entries) // (jobs * 4)))
+    else:
+        for entry in entries:
+            yield analyze_entry(entry, root_dir)
+
+def analyze_pages(pages, root_dir, jobs=1):
+    """Run analyze_entry over (rel_path, entry) pairs and return the results as a list."""
+    return list(iter_analyze_pages(pages, root_dir, jobs))
+
+def analyze_incremental(index, root_dir, cache, jobs=1):
+    """Categorize every page, reusing cached results for unchanged pages."""
+    results = {}
+    stale = []
+    flipped = changed_targets(cache, root_dir)
     
-    all_broken = defaultdict(lambda: defaultdict(set))
+    for rel_path, entry in site_index.iter_pages(index):
+        cached = cache['pages'].get(rel_path)
+        if cached and cached['sha256'] == entry['sha256'] and flipped.isdisjoint(cached['targets']):
+            results[rel_path] = {category: set(urls) for category, urls in cached['broken'].items()}
+        else:
+            results[rel_path] = None
+            stale.append((rel_path, entry))
     
-    print(f"Found {len(html_files)} HTML files\n")
-    
-    for html_file in sorted(html_files):
-        with open(html_file, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        
-        links = extract_links_from_html(content)
-        broken = categorize_broken_links(links, root_dir)
-        
-        if broken:
-            rel_path = os.path.relpath(html_file, root_dir)
-            for category, urls in broken.items():
-                for url in urls:
-                    all_broken[category][url].add(rel_path)
-    
-    # Generate report
+    for (rel_path, entry), (broken, targets) in zip(stale, analyze_pages(stale, root_dir, jobs)):
+        for target in targets:
+            if target not in cache['targets']:
+                cache['targets'][target] = fs_resolver.snapshot(root_dir).exists(target)
+        cache['pages'][rel_path] = {
+            'sha256': entry['sha256'],
+            'targets': targets,
+            'broken': {category: sorted(urls) for category, urls in broken.items()},
+        }
+        results[rel_path] = broken
+    
+    # Forget pages that were removed and targets nothing references any more
+    cache['pages'] = {rel_path: cache['pages'][rel_path] for rel_path in results}
+    used = {target for page in cache['pages'].values() for target in page['targets']}
+    cache['targets'] = {t: e for t, e in cache['targets'].items() if t in used}
+    
+    return results, len(stale)
+
+def iter_results(index, root_dir, args, info):
+    """Yield (rel_path, broken) for every page as soon as it has been analyzed."""
+    if args.incremental:
+        cache = load_cache(root_dir)
+        results, reevaluated = analyze_incremental(index, root_dir, cache, args.jobs)
+        save_cache(cache, root_dir)
+        print(f"Incremental: re-evaluated {reevaluated}, reused {len(results) - reevaluated}\n", file=info)
+        yield from results.items()
+    else:
+        pages = list(site_index.iter_pages(index))
+        for (rel_path, _), (broken, _) in zip(pages, iter_analyze_pages(pages, root_dir, args.jobs)):
+            yield rel_path, broken
+
+def iter_records(rel_path, broken):
+    """Yield one report record per broken reference on a page, in sorted order."""
+    for category in sorted(broken):
+        for url in sorted(broken[category]):
+            yield {'page': rel_path, 'category': category, 'url': url}
+
+def record_key(record):
+    return (record['page'], record['category'], record['url'])
+
+def load_baseline(baseline_path):
+    """Load the broken-reference keys from an earlier --format ndjson run."""
+    keys = set()
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if record.get('status') != 'resolved':
+                keys.add(record_key(record))
+    return keys
+
+def print_report(all_broken):
+    """Print the full human-readable report."""
     print("=" * 80)
     print("BROKEN LINKS ANALYSIS REPORT")
     print("=" * 80)
@@ -138,5 +260,76 @@ def main():
     print(f"  - WP Themes (CSS/JS): {wp_themes}")
     print(f"  - WP Includes (jQuery): {wp_includes}")
 
+def print_baseline_report(new_records, resolved_keys):
+    """Print only what changed relative to the baseline."""
+    print("=" * 80)
+    print("BROKEN LINKS COMPARED TO BASELINE")
+    print("=" * 80)
+    
+    print(f"\n❌ NEW BROKEN REFERENCES: {len(new_records)}")
+    for record in new_records:
+        print(f"  {record['page']}: [{record['category']}] {record['url']}")
+    
+    print(f"\n✅ RESOLVED SINCE BASELINE: {len(resolved_keys)}")
+    for page, category, url in resolved_keys:
+        print(f"  {page}: [{category}] {url}")
+    print()
+
+def main():
+    parser = argparse.ArgumentParser(description='Analyze broken links in HTML files.')
+    parser.add_argument('--incremental', action='store_true',
+                        help=f'reuse cached results for unchanged pages ({CACHE_FILE})')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help='number of worker processes (default: 1)')
+    parser.add_argument('--format', choices=['text', 'ndjson'], default='text',
+                        help='human-readable report or one JSON record per broken reference')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='earlier ndjson output; mark new and resolved breakages')
+    args = parser.parse_args()
+    
+    ndjson = args.format == 'ndjson'
+    # Keep stdout clean for the records in ndjson mode
+    info = sys.stderr if ndjson else sys.stdout
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    
+    root_dir = '/Users/asiboro/Sources/Work/23centuryid'
+    index = site_index.load_index(root_dir, args.jobs)
+    
+    all_broken = defaultdict(lambda: defaultdict(set))
+    current = set()
+    new_records = []
+    
+    print(f"Found {len(index['pages'])} HTML files\n", file=info)
+    
+    for rel_path, broken in iter_results(index, root_dir, args, info):
+        for record in iter_records(rel_path, broken):
+            if baseline is not None:
+                key = record_key(record)
+                current.add(key)
+                record['status'] = 'known' if key in baseline else 'new'
+                if record['status'] == 'new':
+                    new_records.append(record)
+                elif not ndjson:
+                    continue
+            if ndjson:
+                print(json.dumps(record, ensure_ascii=False), flush=True)
+            elif baseline is None:
+                all_broken[record['category']][record['url']].add(rel_path)
+    
+    if baseline is None:
+        if not ndjson:
+            print_report(all_broken)
+        return 0
+    
+    resolved_keys = sorted(baseline - current)
+    if ndjson:
+        for page, category, url in resolved_keys:
+            record = {'page': page, 'category': category, 'url': url, 'status': 'resolved'}
+            print(json.dumps(record, ensure_ascii=False))
+        print(f"{len(new_records)} new, {len(resolved_keys)} resolved since baseline", file=info)
+    else:
+        print_baseline_report(new_records, resolved_keys)
+    return 1 if new_records else 0
+
 if __name__ == '__main__':
-    main()
+    sys.exit(main())
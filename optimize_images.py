@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""
+Recompress and strip the images in assets/img, keeping only real savings.
+
+Every PNG, JPEG and WebP is optimized in a process pool:
+
+    lossless  metadata is stripped (PNG text/time/EXIF chunks, JPEG EXIF/XMP
+              APP segments and comments, WebP EXIF/XMP chunks; colour
+              profiles are kept) and PNG image data is re-deflated at level 9
+    lossy     with Pillow installed, JPEG and lossy WebP are also re-encoded
+              at --quality; a re-encode is only accepted if its PSNR against
+              the original is at least --min-psnr dB
+
+The smallest candidate replaces the file only if it is smaller. Identical
+files are optimized once and written once; the other copies are hardlinked
+to it, so asset_store --link deduplication survives. The sha256 of every file that is already as small
+as these settings make it is cached in .optimize_cache.json, so later runs
+only look at new or changed images. The report lists bytes before and after
+per image and every image still over the --budget.
+
+Usage:
+    python3 optimize_images.py [--jobs 4] [--quality 82] [--lossless] [--dry-run]
+"""
+import argparse
+import hashlib
+import io
+import json
+import math
+import os
+import struct
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+try:
+    from PIL import Image, ImageChops, ImageStat
+except ImportError:
+    Image = None
+
+import asset_store
+import image_headers
+
+ROOT_DIR = Path('/Users/asiboro/Sources/Work/23centuryid')
+IMG_DIR = 'assets/img'
+CACHE_FILE = '.optimize_cache.json'
+CACHE_VERSION = 1
+QUALITY = 82
+MIN_PSNR = 40.0
+BUDGET_KB = 200
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+PNG_METADATA_CHUNKS = {b'tEXt', b'zTXt', b'iTXt', b'tIME', b'eXIf'}
+WEBP_METADATA_CHUNKS = {b'EXIF': 0x08, b'XMP ': 0x04}      # chunk -> VP8X flag bit
+
+
+def optimize_png(data):
+    """Drop metadata chunks and re-deflate the image data; None if data is not a still PNG."""
+    if not data.startswith(PNG_SIGNATURE):
+        return None
+    chunks = []
+    offset = len(PNG_SIGNATURE)
+    while offset + 8 <= len(data):
+        length, kind = struct.unpack('>I4s', data[offset:offset + 8])
+        chunks.append((kind, data[offset + 8:offset + 8 + length]))
+        offset += 12 + length
+        if kind == b'IEND':
+            break
+    kinds = {kind for kind, _ in chunks}
+    if b'IEND' not in kinds or b'acTL' in kinds:
+        return None     # truncated or animated
+    raw = zlib.decompress(b''.join(body for kind, body in chunks if kind == b'IDAT'))
+    compressed = []
+    for strategy in (zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED):
+        compressor = zlib.compressobj(9, zlib.DEFLATED, 15, 9, strategy)
+        compressed.append(compressor.compress(raw) + compressor.flush())
+    idat = min(compressed, key=len)
+
+    out = [PNG_SIGNATURE]
+    for kind, body in chunks:
+        if kind in PNG_METADATA_CHUNKS or (kind == b'IDAT' and idat is None):
+            continue
+        if kind == b'IDAT':
+            body, idat = idat, None
+        out.append(struct.pack('>I', len(body)) + kind + body
+                   + struct.pack('>I', zlib.crc32(kind + body) & 0xffffffff))
+    return b''.join(out)
+
+
+def strip_jpeg(data):
+    """Drop comments and APP1-APP15 segments except ICC profiles and Adobe; None if not a JPEG."""
+    if not data.startswith(b'\xff\xd8'):
+        return None
+    out = [b'\xff\xd8']
+    offset = 2
+    while offset + 4 <= len(data):
+        if data[offset] != 0xFF:
+            return None
+        marker = data[offset + 1]
+        if marker == 0xFF:
+            offset += 1
+            continue
+        if marker == 0xDA:
+            out.append(data[offset:])   # scan data and everything after it stays as is
+            return b''.join(out)
+        length = struct.unpack('>H', data[offset + 2:offset + 4])[0]
+        segment = data[offset:offset + 2 + length]
+        metadata = marker == 0xFE or (0xE1 <= marker <= 0xEF and marker != 0xEE
+                                      and not (marker == 0xE2 and segment[4:16] == b'ICC_PROFILE\x00'))
+        if not metadata:
+            out.append(segment)
+        offset += 2 + length
+    return None
+
+
+def webp_chunks(data):
+    """(kind, payload) of every chunk in a WebP file, or None if data is not a WebP."""
+    if data[:4] != b'RIFF' or data[8:12] != b'WEBP':
+        return None
+    chunks = []
+    offset = 12
+    while offset + 8 <= len(data):
+        kind, length = struct.unpack('<4sI', data[offset:offset + 8])
+        chunks.append((kind, data[offset + 8:offset + 8 + length]))
+        offset += 8 + length + (length & 1)
+    return chunks
+
+
+def strip_webp(data):
+    """Drop EXIF and XMP chunks and clear their VP8X flags; None if data is not a WebP."""
+    chunks = webp_chunks(data)
+    if chunks is None:
+        return None
+    dropped = 0
+    out = []
+    for kind, body in chunks:
+        if kind in WEBP_METADATA_CHUNKS:
+            dropped |= WEBP_METADATA_CHUNKS[kind]
+            continue
+        out.append((kind, body))
+    if not dropped:
+        return data
+    body = b''.join(
+        kind + struct.pack('<I', len(payload))
+        + (bytes([payload[0] & ~dropped & 0xFF]) + payload[1:] if kind == b'VP8X' else payload)
+        + b'\x00' * (len(payload) & 1)
+        for kind, payload in out)
+    return b'RIFF' + struct.pack('<I', 4 + len(body)) + b'WEBP' + body
+
+
+LOSSLESS = {'png': optimize_png, 'jpeg': strip_jpeg, 'webp': strip_webp}
+
+
+def psnr(original, candidate):
+    """Peak signal-to-noise ratio in dB between two Pillow images of the same size."""
+    mode = 'RGBA' if 'A' in original.getbands() or 'A' in candidate.getbands() else 'RGB'
+    difference = ImageChops.difference(original.convert(mode), candidate.convert(mode))
+    mse = sum(rms ** 2 for rms in ImageStat.Stat(difference).rms) / len(mode)
+    return math.inf if mse == 0 else 20 * math.log10(255 / math.sqrt(mse))
+
+
+def reencode(data, image_format, quality, min_psnr):
+    """Pillow re-encode of a JPEG or lossy WebP, or None if it fails the quality threshold."""
+    if Image is None or image_format not in ('jpeg', 'webp'):
+        return None
+    if image_format == 'webp' and any(kind == b'VP8L' for kind, _ in webp_chunks(data) or []):
+        return None     # lossless WebP stays lossless
+    with Image.open(io.BytesIO(data)) as original:
+        if getattr(original, 'n_frames', 1) > 1:
+            return None
+        original.load()
+        options = {'quality': quality}
+        if original.info.get('icc_profile'):
+            options['icc_profile'] = original.info['icc_profile']
+        out = io.BytesIO()
+        if image_format == 'jpeg':
+            image = original if original.mode in ('RGB', 'L', 'CMYK') else original.convert('RGB')
+            image.save(out, 'JPEG', optimize=True, progressive=True, **options)
+        else:
+            original.save(out, 'WEBP', method=6, **options)
+        candidate = out.getvalue()
+        with Image.open(io.BytesIO(candidate)) as decoded:
+            if psnr(original, decoded) < min_psnr:
+                return None
+    return candidate
+
+
+def optimize(task):
+    """Worker: return (path, original size, optimized bytes or None if nothing is smaller)."""
+    path, image_format, quality, min_psnr, lossless_only = task
+    with open(path, 'rb') as f:
+        data = f.read()
+    candidates = [LOSSLESS[image_format](data)]
+    if not lossless_only:
+        candidates.append(reencode(data, image_format, quality, min_psnr))
+    best = min((c for c in candidates if c), key=len, default=None)
+    return path, len(data), best if best is not None and len(best) < len(data) else None
+
+
+def write_optimized(paths, data):
+    """Write data to the first path once and hardlink the other copies to it.
+
+    Copies that asset_store --link hardlinked stay one inode; a copy that
+    cannot be linked (e.g. on another filesystem) gets its own write.
+    """
+    first = paths[0]
+    tmp_path = first + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+    os.replace(tmp_path, first)
+    for target in paths[1:]:
+        if not asset_store.hardlink(first, target):
+            tmp_path = target + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, target)
+
+
+def file_sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def load_cache(settings, root_dir=ROOT_DIR):
+    """The cached set of already-optimal hashes, empty if the settings changed."""
+    try:
+        with open(Path(root_dir) / CACHE_FILE, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        cache = None
+    if not cache or cache.get('version') != CACHE_VERSION or cache.get('settings') != settings:
+        cache = {'version': CACHE_VERSION, 'settings': settings, 'optimal': []}
+    return cache
+
+
+def save_cache(cache, root_dir=ROOT_DIR):
+    cache_path = Path(root_dir) / CACHE_FILE
+    tmp_path = cache_path.with_name(cache_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(cache, f, indent=1)
+    os.replace(tmp_path, cache_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Recompress and strip images in assets/img.')
+    parser.add_argument('--jobs', type=int, default=os.cpu_count() or 1, metavar='N',
+                        help='worker processes (default: %(default)s)')
+    parser.add_argument('--quality', type=int, default=QUALITY,
+                        help='JPEG/WebP re-encode quality (default: %(default)s)')
+    parser.add_argument('--min-psnr', type=float, default=MIN_PSNR,
+                        help='reject re-encodes below this PSNR in dB (default: %(default)s)')
+    parser.add_argument('--lossless', action='store_true', help='only strip metadata and re-deflate PNGs')
+    parser.add_argument('--budget', type=int, default=BUDGET_KB,
+                        help='report images larger than this many KiB (default: %(default)s)')
+    parser.add_argument('--dry-run', action='store_true', help='report savings without writing files')
+    args = parser.parse_args()
+    lossless_only = args.lossless or Image is None
+
+    print("=" * 80)
+    print("OPTIMIZING IMAGES")
+    print("=" * 80)
+    if Image is None and not args.lossless:
+        print("Pillow not installed: lossless optimization only (pip install Pillow for re-encoding)")
+
+    img_dir = ROOT_DIR / IMG_DIR
+    settings = {'quality': args.quality, 'min_psnr': args.min_psnr, 'lossless': lossless_only}
+    cache = load_cache(settings, ROOT_DIR)
+    optimal = set(cache['optimal'])
+
+    # One task per distinct content; non-images and mislabelled files are left to the integrity audit
+    paths_by_hash = {}
+    tasks = []
+    sizes = {}
+    for entry in sorted(os.scandir(img_dir), key=lambda e: e.name):
+        if not entry.is_file():
+            continue
+        image_format = image_headers.EXTENSION_FORMATS.get(Path(entry.name).suffix.lower())
+        if image_format not in LOSSLESS or image_headers.sniff(entry.path).format != image_format:
+            continue
+        with open(entry.path, 'rb') as f:
+            sha256 = file_sha256(f.read())
+        sizes[entry.name] = entry.stat().st_size
+        if sha256 in optimal:
+            continue
+        if sha256 not in paths_by_hash:
+            tasks.append((entry.path, image_format, args.quality, args.min_psnr, lossless_only))
+        paths_by_hash.setdefault(sha256, []).append(entry.path)
+    print(f"{len(sizes)} images, {len(tasks)} to optimize ({len(sizes) - sum(map(len, paths_by_hash.values()))} cached)\n")
+
+    hash_of = {paths[0]: sha256 for sha256, paths in paths_by_hash.items()}
+    savings = []
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        for path, before, optimized in pool.map(optimize, tasks):
+            sha256 = hash_of[path]
+            if optimized is None:
+                optimal.add(sha256)
+                continue
+            optimal.add(file_sha256(optimized))
+            for target in paths_by_hash[sha256]:
+                savings.append((os.path.basename(target), before, len(optimized)))
+                sizes[os.path.basename(target)] = len(optimized)
+            if not args.dry_run:
+                write_optimized(paths_by_hash[sha256], optimized)
+    if not args.dry_run:
+        cache['optimal'] = sorted(optimal)
+        save_cache(cache, ROOT_DIR)
+
+    print(f"{'image':<56} {'before':>10} {'after':>10} {'saved':>7}")
+    for name, before, after in sorted(savings, key=lambda s: s[2] - s[1]):
+        print(f"{name:<56} {before:>10,} {after:>10,} {100 * (before - after) / before:>6.1f}%")
+    total_before = sum(before for _, before, _ in savings)
+    total_after = sum(after for _, _, after in savings)
+
+    over_budget = sorted(((size, name) for name, size in sizes.items() if size > args.budget * 1024), reverse=True)
+    print(f"\nOver the {args.budget} KiB budget: {len(over_budget)}")
+    for size, name in over_budget:
+        print(f"  {name:<56} {size:>10,}")
+
+    print(f"\n{'-' * 80}")
+    verb = "Would save" if args.dry_run else "Saved"
+    print(f"{verb} {total_before - total_after:,} bytes on {len(savings)} images "
+          f"({total_before:,} -> {total_after:,})")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
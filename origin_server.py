@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for https://23c.jp for offline fetcher tests and benchmarks.
+
+Serves the fetched_pages/ snapshots and assets/ files under the original
+WordPress URL layout (/about/, /wp-content/uploads/2025/03/about.webp,
+/wp-content/themes/_23c/img/...). Responses carry ETag and Last-Modified and
+honour If-None-Match / If-Modified-Since (304) and Range / If-Range (206), like the
+real origin. Faults can be injected to exercise the fetchers' concurrency,
+retry and caching paths reproducibly:
+
+    --latency 0.2 --jitter 0.1   delay every response
+    --not-found-rate 0.05        answer a fraction of requests with 404
+    --truncate-rate 0.05         cut a fraction of bodies short
+    --rate-limit 20              429 once a client exceeds N requests/s
+    --not-modified-rate 0.05     answer a fraction of conditional requests
+                                 with 304 even if the validators are stale
+
+Point a fetcher at it with its --base-url option, e.g.
+    python3 origin_server.py --port 8023 &
+    python3 fetch_all_missing_images.py --base-url http://127.0.0.1:8023
+"""
+import argparse
+import os
+import random
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import NamedTuple
+from urllib.parse import unquote, urlsplit
+
+ROOT_DIR = Path('/Users/asiboro/Sources/Work/23centuryid')
+SNAPSHOT_DIRS = ['fetched_pages', 'fetched_pages/deeper']
+ASSET_DIRS = ['assets/img', 'assets/css', 'assets/js']
+CHUNK_SIZE = 64 * 1024
+CONTENT_TYPES = {
+    '.html': 'text/html; charset=UTF-8', '.css': 'text/css', '.js': 'application/javascript',
+    '.png': 'image/png', '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg', '.gif': 'image/gif',
+    '.webp': 'image/webp', '.svg': 'image/svg+xml', '.ico': 'image/x-icon', '.txt': 'text/plain',
+}
+
+
+class Faults(NamedTuple):
+    latency: float = 0.0
+    jitter: float = 0.0
+    not_found_rate: float = 0.0
+    truncate_rate: float = 0.0
+    rate_limit: float = 0.0     # requests per second per client, 0 for unlimited
+    not_modified_rate: float = 0.0
+
+
+def page_routes(root_dir):
+    """Map URL paths to snapshot files: 23c.jp_about_.html serves /about/."""
+    routes = {}
+    for rel_dir in SNAPSHOT_DIRS:
+        snapshot_dir = Path(root_dir) / rel_dir
+        if not snapshot_dir.is_dir():
+            continue
+        for path in sorted(snapshot_dir.glob('*.html')):
+            # 'fetched_pages/deeper' comes last, so its fuller crawl wins
+            name = path.name[:-len('.html')]
+            if '_' not in name:
+                continue    # not a host_path snapshot, e.g. 23c.jp.html; never let it replace /
+            rest = name.split('_', 1)[1]
+            routes['/' + rest.replace('_', '/').lstrip('/')] = path
+    return routes
+
+
+def asset_routes(root_dir):
+    """Map asset file names to files; WordPress paths are served by basename."""
+    assets = {}
+    for rel_dir in ASSET_DIRS:
+        asset_dir = Path(root_dir) / rel_dir
+        if asset_dir.is_dir():
+            for entry in os.scandir(asset_dir):
+                if entry.is_file():
+                    assets.setdefault(entry.name, Path(entry.path))
+    return assets
+
+
+class OriginServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, root_dir=ROOT_DIR, faults=Faults(), seed=None):
+        super().__init__(address, OriginHandler)
+        self.pages = page_routes(root_dir)
+        self.assets = asset_routes(root_dir)
+        self.faults = faults
+        self.random = random.Random(seed)
+        self.verbose = False
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def chance(self, rate):
+        with self._lock:
+            return rate > 0 and self.random.random() < rate
+
+    def delay(self):
+        with self._lock:
+            jitter = self.random.uniform(-self.faults.jitter, self.faults.jitter)
+        return max(0.0, self.faults.latency + jitter)
+
+    def allow(self, client):
+        """Per-client token bucket; False means the request should get a 429."""
+        rate = self.faults.rate_limit
+        if not rate:
+            return True
+        with self._lock:
+            tokens, updated = self._buckets.get(client, (rate, time.monotonic()))
+            now = time.monotonic()
+            tokens = min(rate, tokens + (now - updated) * rate)
+            allowed = tokens >= 1
+            self._buckets[client] = (tokens - 1 if allowed else tokens, now)
+        return allowed
+
+    def resolve(self, url_path):
+        """Return the file serving url_path, or None."""
+        if url_path == '/robots.txt':
+            return None
+        if url_path.startswith(('/wp-content/', '/wp-includes/')):
+            return self.assets.get(os.path.basename(url_path))
+        if not url_path.endswith('/') and '.' not in os.path.basename(url_path):
+            url_path += '/'
+        return self.pages.get(url_path)
+
+
+class OriginHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'OriginStandIn/1.0'
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_empty(self, status, headers=()):
+        self.send_response(status)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def do_HEAD(self):
+        self.do_GET(head=True)
+
+    def do_GET(self, head=False):
+        server = self.server
+        if not server.allow(self.client_address[0]):
+            self._send_empty(429, [('Retry-After', '1')])
+            return
+        delay = server.delay()
+        if delay:
+            time.sleep(delay)
+
+        url_path = unquote(urlsplit(self.path).path)
+        if url_path == '/robots.txt':
+            body = b'User-agent: *\nAllow: /\n'
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            if not head:
+                self.wfile.write(body)
+            return
+
+        path = server.resolve(url_path)
+        if path is None or server.chance(server.faults.not_found_rate):
+            self._send_empty(404)
+            return
+
+        stat = path.stat()
+        etag = f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+        last_modified = formatdate(stat.st_mtime, usegmt=True)
+        validators = [('ETag', etag), ('Last-Modified', last_modified)]
+        if self._not_modified(etag, stat.st_mtime) or (
+                self._is_conditional() and server.chance(server.faults.not_modified_rate)):
+            self._send_empty(304, validators)
+            return
+
+        start, status = 0, 200
+        range_header = self.headers.get('Range', '')
+        if_range = self.headers.get('If-Range')
+        if if_range and if_range not in (etag, last_modified):
+            range_header = ''   # the client's partial copy is stale; send the whole file
+        if range_header.startswith('bytes=') and range_header[6:].split('-')[0].isdigit():
+            start = int(range_header[6:].split('-')[0])
+            if start >= stat.st_size:
+                self._send_empty(416, [('Content-Range', f'bytes */{stat.st_size}')])
+                return
+            status = 206
+        length = stat.st_size - start
+
+        self.send_response(status)
+        self.send_header('Content-Type', CONTENT_TYPES.get(path.suffix.lower(), 'application/octet-stream'))
+        self.send_header('Content-Length', str(length))
+        self.send_header('Accept-Ranges', 'bytes')
+        if status == 206:
+            self.send_header('Content-Range', f'bytes {start}-{stat.st_size - 1}/{stat.st_size}')
+        for name, value in validators:
+            self.send_header(name, value)
+        self.end_headers()
+        if head:
+            return
+
+        # A truncated body announces the full length but stops halfway
+        limit = length // 2 if server.chance(server.faults.truncate_rate) else length
+        with open(path, 'rb') as f:
+            f.seek(start)
+            sent = 0
+            while sent < limit:
+                chunk = f.read(min(CHUNK_SIZE, limit - sent))
+                if not chunk:
+                    break
+                self.wfile.write(chunk)
+                sent += len(chunk)
+        if limit < length:
+            self.close_connection = True
+
+    def _is_conditional(self):
+        return bool(self.headers.get('If-None-Match') or self.headers.get('If-Modified-Since'))
+
+    def _not_modified(self, etag, mtime):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            return etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*'
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+        return False
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve the mirrored site as a local stand-in origin.')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8023)
+    parser.add_argument('--root', default=str(ROOT_DIR), help='site root (default: %(default)s)')
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='random +/- seconds on top of --latency')
+    parser.add_argument('--not-found-rate', type=float, default=0.0, help='fraction of requests answered 404')
+    parser.add_argument('--truncate-rate', type=float, default=0.0, help='fraction of bodies cut short')
+    parser.add_argument('--rate-limit', type=float, default=0.0,
+                        help='requests per second per client before 429 (default: unlimited)')
+    parser.add_argument('--not-modified-rate', type=float, default=0.0,
+                        help='fraction of conditional requests answered 304 whatever their validators')
+    parser.add_argument('--seed', type=int, default=None, help='seed for reproducible fault injection')
+    parser.add_argument('--verbose', action='store_true', help='log every request')
+    args = parser.parse_args()
+
+    faults = Faults(args.latency, args.jitter, args.not_found_rate, args.truncate_rate, args.rate_limit,
+                    args.not_modified_rate)
+    server = OriginServer((args.host, args.port), args.root, faults, args.seed)
+    server.verbose = args.verbose
+
+    print("=" * 80)
+    print(f"ORIGIN STAND-IN on http://{args.host}:{args.port}/")
+    print("=" * 80)
+    print(f"Pages: {len(server.pages)}, assets: {len(server.assets)}")
+    print(f"Faults: {faults._asdict()}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Placeholder images in real PNG, WebP and JPEG encodings.
+
+A placeholder is a flat background with an optional centered label drawn
+in a 5x7 bitmap font. The image is held as a list of rows of palette
+indices (0 = background, 1 = label), and every background row is the same
+object, so the stdlib PNG encoder filters each distinct row once and
+streams the rows through zlib.compressobj.
+
+With Pillow installed the rows are handed to Pillow, which writes the
+format matching the file extension (.png, .webp, .jpg, .jpeg); WebP is
+lossless. Without Pillow only .png placeholders can be written.
+
+Usage:
+    python3 placeholder_image.py out.webp 1200 800 [--label "Cell Laboratory"]
+"""
+import argparse
+import io
+import os
+import struct
+import zlib
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+BACKGROUND = (200, 200, 200)
+FOREGROUND = (102, 102, 102)
+LABEL_WIDTH_RATIO = 0.8
+LABEL_HEIGHT_RATIO = 0.25
+
+# 5x7 glyphs, one 5-bit row per entry, most significant bit on the left
+FONT = {
+    'A': (0x0E, 0x11, 0x11, 0x1F, 0x11, 0x11, 0x11), 'B': (0x1E, 0x11, 0x11, 0x1E, 0x11, 0x11, 0x1E),
+    'C': (0x0E, 0x11, 0x10, 0x10, 0x10, 0x11, 0x0E), 'D': (0x1E, 0x11, 0x11, 0x11, 0x11, 0x11, 0x1E),
+    'E': (0x1F, 0x10, 0x10, 0x1E, 0x10, 0x10, 0x1F), 'F': (0x1F, 0x10, 0x10, 0x1E, 0x10, 0x10, 0x10),
+    'G': (0x0E, 0x11, 0x10, 0x17, 0x11, 0x11, 0x0F), 'H': (0x11, 0x11, 0x11, 0x1F, 0x11, 0x11, 0x11),
+    'I': (0x0E, 0x04, 0x04, 0x04, 0x04, 0x04, 0x0E), 'J': (0x07, 0x02, 0x02, 0x02, 0x02, 0x12, 0x0C),
+    'K': (0x11, 0x12, 0x14, 0x18, 0x14, 0x12, 0x11), 'L': (0x10, 0x10, 0x10, 0x10, 0x10, 0x10, 0x1F),
+    'M': (0x11, 0x1B, 0x15, 0x15, 0x11, 0x11, 0x11), 'N': (0x11, 0x11, 0x19, 0x15, 0x13, 0x11, 0x11),
+    'O': (0x0E, 0x11, 0x11, 0x11, 0x11, 0x11, 0x0E), 'P': (0x1E, 0x11, 0x11, 0x1E, 0x10, 0x10, 0x10),
+    'Q': (0x0E, 0x11, 0x11, 0x11, 0x15, 0x12, 0x0D), 'R': (0x1E, 0x11, 0x11, 0x1E, 0x14, 0x12, 0x11),
+    'S': (0x0F, 0x10, 0x10, 0x0E, 0x01, 0x01, 0x1E), 'T': (0x1F, 0x04, 0x04, 0x04, 0x04, 0x04, 0x04),
+    'U': (0x11, 0x11, 0x11, 0x11, 0x11, 0x11, 0x0E), 'V': (0x11, 0x11, 0x11, 0x11, 0x11, 0x0A, 0x04),
+    'W': (0x11, 0x11, 0x11, 0x15, 0x15, 0x15, 0x0A), 'X': (0x11, 0x11, 0x0A, 0x04, 0x0A, 0x11, 0x11),
+    'Y': (0x11, 0x11, 0x11, 0x0A, 0x04, 0x04, 0x04), 'Z': (0x1F, 0x01, 0x02, 0x04, 0x08, 0x10, 0x1F),
+    '0': (0x0E, 0x11, 0x13, 0x15, 0x19, 0x11, 0x0E), '1': (0x04, 0x0C, 0x04, 0x04, 0x04, 0x04, 0x0E),
+    '2': (0x0E, 0x11, 0x01, 0x02, 0x04, 0x08, 0x1F), '3': (0x1F, 0x02, 0x04, 0x02, 0x01, 0x11, 0x0E),
+    '4': (0x02, 0x06, 0x0A, 0x12, 0x1F, 0x02, 0x02), '5': (0x1F, 0x10, 0x1E, 0x01, 0x01, 0x11, 0x0E),
+    '6': (0x06, 0x08, 0x10, 0x1E, 0x11, 0x11, 0x0E), '7': (0x1F, 0x01, 0x02, 0x04, 0x08, 0x08, 0x08),
+    '8': (0x0E, 0x11, 0x11, 0x0E, 0x11, 0x11, 0x0E), '9': (0x0E, 0x11, 0x11, 0x0F, 0x01, 0x02, 0x0C),
+    '-': (0x00, 0x00, 0x00, 0x1F, 0x00, 0x00, 0x00), '_': (0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x1F),
+    '.': (0x00, 0x00, 0x00, 0x00, 0x00, 0x0C, 0x0C), ' ': (0x00,) * 7,
+    '?': (0x0E, 0x11, 0x01, 0x02, 0x04, 0x00, 0x04),
+}
+GLYPH_WIDTH, GLYPH_HEIGHT = 5, 7
+
+
+def render_rows(width, height, label=None):
+    """Rows of palette indices (bytes of 0/1); rows without label pixels are one shared object."""
+    blank = bytes(width)
+    rows = [blank] * height
+    text = (label or '').upper()
+    advance = GLYPH_WIDTH + 1
+    # Largest integer scale that fits; drop trailing characters if even 1x is too wide
+    text = text[:max(0, int(width * LABEL_WIDTH_RATIO) // advance)]
+    if not text.strip():
+        return rows
+    scale = max(1, min(int(width * LABEL_WIDTH_RATIO) // (advance * len(text)),
+                       int(height * LABEL_HEIGHT_RATIO) // GLYPH_HEIGHT))
+    if GLYPH_HEIGHT * scale > height:
+        return rows
+
+    left = (width - (advance * len(text) - 1) * scale) // 2
+    top = (height - GLYPH_HEIGHT * scale) // 2
+    for glyph_row in range(GLYPH_HEIGHT):
+        row = bytearray(width)
+        for i, char in enumerate(text):
+            bits = FONT.get(char, FONT['?'])[glyph_row]
+            for col in range(GLYPH_WIDTH):
+                if bits & (0x10 >> col):
+                    x = left + (i * advance + col) * scale
+                    row[x:x + scale] = b'\x01' * scale
+        row = bytes(row)
+        for y in range(top + glyph_row * scale, top + (glyph_row + 1) * scale):
+            rows[y] = row
+    return rows
+
+
+# PNG
+
+def _png_chunk(kind, data):
+    return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff)
+
+
+def encode_png(width, height, rows, background=BACKGROUND, foreground=FOREGROUND):
+    """8-bit palette PNG; each distinct row is filtered once and streamed to zlib."""
+    compressor = zlib.compressobj(9)
+    scanlines = {}
+    parts = []
+    for row in rows:
+        scanline = scanlines.get(id(row))
+        if scanline is None:
+            scanline = scanlines[id(row)] = b'\x00' + row
+        parts.append(compressor.compress(scanline))
+    parts.append(compressor.flush())
+    return b''.join([
+        b'\x89PNG\r\n\x1a\n',
+        _png_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 3, 0, 0, 0)),
+        _png_chunk(b'PLTE', bytes(background) + bytes(foreground)),
+        _png_chunk(b'IDAT', b''.join(parts)),
+        _png_chunk(b'IEND', b''),
+    ])
+
+
+PILLOW_FORMATS = {
+    '.png': 'PNG',
+    '.webp': 'WEBP',
+    '.jpg': 'JPEG',
+    '.jpeg': 'JPEG',
+}
+SAVE_OPTIONS = {
+    'PNG': {'optimize': True},
+    'WEBP': {'lossless': True},
+    'JPEG': {'quality': 90},
+}
+
+
+def encode_pillow(width, height, rows, image_format, background=BACKGROUND, foreground=FOREGROUND):
+    """Encode the rows with Pillow in image_format ('PNG', 'WEBP' or 'JPEG')."""
+    image = Image.frombytes('P', (width, height), b''.join(rows))
+    image.putpalette(bytes(background) + bytes(foreground))
+    if image_format != 'PNG':
+        image = image.convert('RGB')
+    out = io.BytesIO()
+    image.save(out, image_format, **SAVE_OPTIONS[image_format])
+    return out.getvalue()
+
+
+def create_placeholder(filename, width, height, label=None, background=BACKGROUND, foreground=FOREGROUND):
+    """Encoded placeholder bytes in the format matching filename's extension."""
+    extension = os.path.splitext(filename)[1].lower()
+    if extension not in PILLOW_FORMATS:
+        raise ValueError(f"unsupported placeholder format: {extension or filename}")
+    rows = render_rows(width, height, label)
+    if Image is not None:
+        return encode_pillow(width, height, rows, PILLOW_FORMATS[extension], background, foreground)
+    if extension != '.png':
+        raise ValueError(f"{extension} placeholders need Pillow: pip install Pillow")
+    return encode_png(width, height, rows, background, foreground)
+
+
+def write_placeholder(filepath, width, height, label=None):
+    """Write a placeholder image to filepath; return its size in bytes."""
+    data = create_placeholder(str(filepath), width, height, label)
+    with open(filepath, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a placeholder image (PNG, WebP or JPEG by extension).')
+    parser.add_argument('path')
+    parser.add_argument('width', type=int)
+    parser.add_argument('height', type=int)
+    parser.add_argument('--label', default=None, help='text drawn in the middle of the image')
+    args = parser.parse_args()
+    size = write_placeholder(args.path, args.width, args.height, args.label)
+    print(f"✓ {args.path} ({args.width}x{args.height}, {size:,} bytes)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Index of where each asset file name lives on the origin.
+
+Every /wp-content/ or /wp-includes/ path found in scripts/sitemap.xml,
+assets/uploads_urls.txt and the fetched_pages HTML is recorded under its
+file name, e.g. 'about-300x200.webp' -> '/wp-content/uploads/2025/03/...'.
+The index is saved to .remote_paths.json in the site root and rebuilt only
+when one of its sources changes. Fetchers resolve a file name here and
+request exactly one URL instead of probing upload folders one by one.
+"""
+import hashlib
+import json
+import os
+import posixpath
+import re
+from pathlib import Path
+from urllib.parse import unquote, urlsplit
+
+import site_index
+
+ROOT_DIR = Path('/Users/asiboro/Sources/Work/23centuryid')
+INDEX_FILE = '.remote_paths.json'
+INDEX_VERSION = 1
+SOURCE_FILES = ['scripts/sitemap.xml', 'assets/uploads_urls.txt']
+WP_PATH_PATTERN = re.compile(r'/wp-(?:content|includes)/[^\s"\'<>()?#]+')
+
+
+def _source_signature(root_dir, site):
+    """Fingerprint of every source, so a stale index can be detected cheaply."""
+    signature = {}
+    for rel_path in SOURCE_FILES:
+        try:
+            stat = os.stat(Path(root_dir) / rel_path)
+            signature[rel_path] = [stat.st_mtime, stat.st_size]
+        except OSError:
+            signature[rel_path] = None
+    digest = hashlib.sha256()
+    for rel_path, entry in site_index.iter_pages(site):
+        if site_index.is_fetched_page(rel_path):
+            digest.update(f"{rel_path}:{entry['sha256']}\n".encode())
+    signature['fetched_pages'] = digest.hexdigest()
+    return signature
+
+
+def _add(paths, url):
+    path = unquote(urlsplit(url.strip()).path)
+    match = WP_PATH_PATTERN.search(path)
+    if not match:
+        return
+    path = match.group(0)
+    filename = posixpath.basename(path)
+    if filename and '.' in filename:
+        paths.setdefault(filename, set()).add(path)
+
+
+def build_remote_paths(root_dir=ROOT_DIR, site=None):
+    """Collect file name -> remote paths from every source."""
+    site = site or site_index.load_index(root_dir)
+    paths = {}
+    for rel_path in SOURCE_FILES:
+        try:
+            with open(Path(root_dir) / rel_path, 'r', encoding='utf-8', errors='ignore') as f:
+                text = f.read()
+        except OSError as e:
+            # A typo in SOURCE_FILES must not quietly shrink the index
+            print(f"⚠️  Remote path source {rel_path} not readable: {e.strerror}")
+            continue
+        if not text.strip():
+            print(f"⚠️  Remote path source {rel_path} is empty")
+        for match in WP_PATH_PATTERN.finditer(text):
+            _add(paths, match.group(0))
+    for rel_path, entry in site_index.iter_pages(site):
+        if site_index.is_fetched_page(rel_path):
+            for ref in entry['refs']:
+                _add(paths, ref['url'])
+    return {
+        'version': INDEX_VERSION,
+        'sources': _source_signature(root_dir, site),
+        'paths': {name: sorted(found) for name, found in sorted(paths.items())},
+    }
+
+
+def load_remote_paths(root_dir=ROOT_DIR):
+    """Load the saved index, rebuilding and saving it if any source changed."""
+    index_path = Path(root_dir) / INDEX_FILE
+    site = site_index.load_index(root_dir)
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = None
+    if (index and index.get('version') == INDEX_VERSION
+            and index.get('sources') == _source_signature(root_dir, site)):
+        return index
+
+    index = build_remote_paths(root_dir, site)
+    tmp_path = index_path.with_name(index_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=1)
+    os.replace(tmp_path, index_path)
+    return index
+
+
+def resolve(index, filename):
+    """Return the remote path for filename, or None if it is unknown.
+
+    If a name was seen under several paths, uploads win over theme files and
+    the latest upload folder wins among uploads.
+    """
+    paths = index['paths'].get(filename)
+    if not paths:
+        return None
+    uploads = [path for path in paths if path.startswith('/wp-content/uploads/')]
+    return max(uploads) if uploads else paths[0]
+
+
+def main():
+    print("=" * 80)
+    print("REMOTE PATH INDEX")
+    print("=" * 80)
+
+    index = load_remote_paths(ROOT_DIR)
+    ambiguous = sum(1 for paths in index['paths'].values() if len(paths) > 1)
+    print(f"\n{len(index['paths'])} file names -> {ROOT_DIR / INDEX_FILE}")
+    print(f"{ambiguous} names found under more than one path")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Single-pass URL rewrite engine.
+
+All mapping keys are compiled once into a trie. A page is then rewritten in
+one left-to-right pass: at every quote character the trie is walked over the
+following text, and the longest key that is closed by the same quote is
+replaced. The cost per page depends on the page size, not on the number of
+mapping entries, so mapping tables with thousands of entries stay cheap.
+"""
+import re
+from typing import NamedTuple
+
+_END = object()
+QUOTE_PATTERN = re.compile(r'["\']')
+
+
+class Substitution(NamedTuple):
+    """One replacement made by RewriteEngine.rewrite."""
+    offset: int    # offset of the opening quote in the original content
+    key: str       # mapping key that matched
+    old: str       # quoted value as it appeared, including any query string
+    new: str
+
+
+class RewriteEngine:
+    """Rewrites quoted values that exactly match a mapping key.
+
+    Keys listed in `strip_query` also match when followed by a query string
+    (e.g. "/wp-includes/js/jquery/jquery.min.js?ver=3.7.1"); the query string
+    is dropped from the replacement.
+    """
+
+    def __init__(self, mapping, strip_query=()):
+        self.mapping = dict(mapping)
+        self.strip_query = set(strip_query)
+        self.trie = {}
+        for key in self.mapping:
+            node = self.trie
+            for ch in key:
+                node = node.setdefault(ch, {})
+            node[_END] = key
+        self._query_end = {
+            '"': re.compile(r'[^"\s]*"'),
+            "'": re.compile(r"[^'\s]*'"),
+        }
+
+    def _match(self, content, start, quote):
+        """Return (key, end) for the longest key quoted at `start`, or None."""
+        node = self.trie
+        best = None
+        i = start
+        n = len(content)
+        while i < n:
+            node = node.get(content[i])
+            if node is None:
+                break
+            i += 1
+            key = node.get(_END)
+            if key is None or i >= n:
+                continue
+            if content[i] == quote:
+                best = (key, i + 1)
+            elif content[i] == '?' and key in self.strip_query:
+                tail = self._query_end[quote].match(content, i)
+                if tail:
+                    best = (key, tail.end())
+        return best
+
+    def rewrite(self, content):
+        """Rewrite content in one pass; return (new_content, substitutions)."""
+        out = []
+        substitutions = []
+        last = 0
+        pos = 0
+        while True:
+            match = QUOTE_PATTERN.search(content, pos)
+            if match is None:
+                break
+            start = match.start()
+            quote = match.group()
+            found = self._match(content, start + 1, quote)
+            if found is None:
+                pos = start + 1
+                continue
+            key, end = found
+            new = self.mapping[key]
+            out.append(content[last:start])
+            out.append(f'{quote}{new}{quote}')
+            substitutions.append(Substitution(start, key, content[start + 1:end - 1], new))
+            last = pos = end
+        if not substitutions:
+            return content, substitutions
+        out.append(content[last:])
+        return ''.join(out), substitutions
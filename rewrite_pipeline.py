@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+Run every HTML rewrite rule over the site in a single pass.
+
+Each page is read once, passed through the registered stages in order, and
+written once via a temp file and rename, or not written at all if nothing
+changed. The stages are the content rewrites of fix_broken_links,
+fix_srcset_paths, fix_absolute_image_urls, fix_css_js_paths,
+fix_remaining_links and fix_img_dimensions, in the order those scripts were
+meant to be run.
+
+Use --dry-run to print a unified diff instead of writing anything.
+"""
+import argparse
+import difflib
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+import site_index
+import fix_absolute_image_urls
+import fix_broken_links
+import fix_css_js_paths
+import fix_img_dimensions
+import fix_remaining_links
+import fix_srcset_paths
+
+ROOT_DIR = Path('/Users/asiboro/Sources/Work/23centuryid')
+
+
+class Stage(NamedTuple):
+    """A rewrite rule: rewrite(content) returns (new_content, change_count)."""
+    name: str
+    rewrite: Callable
+    include_fetched: bool
+
+
+STAGES = []
+
+
+def register_stage(name, include_fetched=True):
+    """Decorator that appends a rewrite function to the pipeline."""
+    def decorator(rewrite):
+        STAGES.append(Stage(name, rewrite, include_fetched))
+        return rewrite
+    return decorator
+
+
+_broken_links_engine = fix_broken_links.build_engine(fix_broken_links.create_mapping())
+
+
+@register_stage('broken_links')
+def rewrite_broken_links(content):
+    content, substitutions = _broken_links_engine.rewrite(content)
+    return content, len(substitutions)
+
+
+# fix_srcset_paths and fix_absolute_image_urls never touched fetched_pages
+register_stage('srcset_paths', include_fetched=False)(fix_srcset_paths.fix_srcset_content)
+register_stage('absolute_image_urls', include_fetched=False)(fix_absolute_image_urls.fix_absolute_urls)
+register_stage('css_js_paths')(fix_css_js_paths.fix_theme_content)
+register_stage('wordpress_image_paths')(fix_remaining_links.fix_wordpress_image_content)
+# Last, so that it sees the final /assets/img/ paths
+register_stage('img_dimensions', include_fetched=False)(fix_img_dimensions.fix_img_dimensions)
+
+
+def run_stages(content, fetched=False):
+    """Pass content through every stage; return (new_content, {stage: count})."""
+    counts = {}
+    for stage in STAGES:
+        if fetched and not stage.include_fetched:
+            continue
+        content, count = stage.rewrite(content)
+        if count:
+            counts[stage.name] = count
+    return content, counts
+
+
+def atomic_write(path, content):
+    """Write content to path via a temp file in the same directory and a rename."""
+    path = Path(path)
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(content)
+        shutil.copymode(path, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run all HTML rewrite rules in one pass.')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='print a unified diff instead of writing files')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print("REWRITE PIPELINE" + (" (dry run)" if args.dry_run else ""))
+    print("=" * 80)
+    print(f"Stages: {', '.join(stage.name for stage in STAGES)}\n")
+
+    index = site_index.load_index(ROOT_DIR)
+    files_changed = 0
+    totals = {}
+
+    for rel_path, _ in site_index.iter_pages(index):
+        filepath = ROOT_DIR / rel_path
+        with open(filepath, 'r', encoding='utf-8', errors='ignore') as f:
+            content = f.read()
+
+        new_content, counts = run_stages(content, site_index.is_fetched_page(rel_path))
+        if new_content == content:
+            continue
+
+        files_changed += 1
+        for name, count in counts.items():
+            totals[name] = totals.get(name, 0) + count
+
+        if args.dry_run:
+            sys.stdout.writelines(difflib.unified_diff(
+                content.splitlines(keepends=True), new_content.splitlines(keepends=True),
+                fromfile=f'a/{rel_path}', tofile=f'b/{rel_path}'))
+        else:
+            atomic_write(filepath, new_content)
+            summary = ', '.join(f"{name} {count}" for name, count in counts.items())
+            print(f"  ✓ {rel_path}: {summary}")
+
+    print(f"\n{'-' * 80}")
+    print(f"{'Would change' if args.dry_run else 'Changed'} {files_changed} of {len(index['pages'])} HTML files")
+    for stage in STAGES:
+        print(f"  - {stage.name}: {totals.get(stage.name, 0)}")
+    print("=" * 80)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Build a persistent index of every outgoing reference in the site's HTML files.
+
+The tree is walked once and each page is parsed once by html_refs. The
+result is saved to .site_index.json in the site root so the analyzers and
+fixers can query it instead of rescanning every file. Pages whose mtime or size changed since the
+last run are hashed when the index is loaded and re-parsed only if their
+content actually differs; everything else is reused. Each entry also
+records which raw strings the fixers searched it for (see pages_containing).
+"""
+import hashlib
+import json
+import os
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from urllib.parse import urljoin, urlsplit
+
+import html_refs
+
+ROOT_DIR = Path('/Users/asiboro/Sources/Work/23centuryid')
+INDEX_FILE = '.site_index.json'
+INDEX_VERSION = 4
+SKIP_DIRS = {'.git', 'node_modules', '.venv', '__pycache__'}
+
+
+def find_all_html_files(root_dir):
+    """Find all HTML files in the directory tree."""
+    html_files = []
+    for root, dirs, files in os.walk(root_dir):
+        dirs[:] = [d for d in dirs if d not in SKIP_DIRS]
+        for file in files:
+            if file.endswith('.html'):
+                html_files.append(os.path.join(root, file))
+    return html_files
+
+
+def index_page(path, previous=None):
+    """Parse one page and return its index entry.
+
+    If `previous` has the same content hash, its references are reused
+    instead of parsing the page again.
+    """
+    stat = os.stat(path)
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(html_refs.CHUNK_SIZE), b''):
+            digest.update(chunk)
+    sha256 = digest.hexdigest()
+    contains = previous.get('contains', {}) if previous else {}
+    if previous and previous.get('sha256') == sha256:
+        refs, anchors = previous['refs'], previous['anchors']
+    else:
+        references, anchor_set = html_refs.scan_file(path)
+        refs = [ref._asdict() for ref in references]
+        anchors = sorted(anchor_set)
+        # Re-check the raw needles recorded for the old content
+        contains = scan_needles(path, contains) if contains else {}
+    return {
+        'mtime': stat.st_mtime,
+        'size': stat.st_size,
+        'sha256': sha256,
+        'refs': refs,
+        'anchors': anchors,
+        'contains': contains,
+    }
+
+
+def scan_needles(path, needles):
+    """Map each needle to whether the raw bytes of path contain it."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return {needle: needle.encode('utf-8') in data for needle in needles}
+
+
+def build_index(root_dir=ROOT_DIR, previous=None, jobs=1):
+    """Walk the tree once, reusing entries from `previous` for unchanged pages.
+
+    With jobs > 1 the pages that need re-parsing are spread over a process pool.
+    """
+    root_dir = str(root_dir)
+    old_pages = previous['pages'] if previous else {}
+    pages = {}
+    stale = []
+
+    for html_file in sorted(find_all_html_files(root_dir)):
+        rel_path = os.path.relpath(html_file, root_dir).replace(os.sep, '/')
+        stat = os.stat(html_file)
+        old = old_pages.get(rel_path)
+        if old and old['mtime'] == stat.st_mtime and old['size'] == stat.st_size:
+            pages[rel_path] = old
+        else:
+            pages[rel_path] = None
+            stale.append((rel_path, html_file, old))
+
+    if jobs > 1 and len(stale) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            entries = list(pool.map(index_page, [s[1] for s in stale], [s[2] for s in stale],
+                                    chunksize=max(1, len(stale) // (jobs * 4))))
+    else:
+        entries = [index_page(html_file, old) for _, html_file, old in stale]
+    for (rel_path, _, _), entry in zip(stale, entries):
+        pages[rel_path] = entry
+
+    changed = bool(stale) or set(pages) != set(old_pages)
+    return {'version': INDEX_VERSION, 'pages': pages}, changed
+
+
+def save_index(index, root_dir=ROOT_DIR):
+    """Write the index to disk, replacing the previous copy atomically."""
+    index_path = Path(root_dir) / INDEX_FILE
+    tmp_path = index_path.with_name(index_path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp_path, index_path)
+
+
+def read_index(root_dir=ROOT_DIR):
+    """Read the saved index, or None if it is missing or from another version."""
+    index_path = Path(root_dir) / INDEX_FILE
+    try:
+        with open(index_path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get('version') != INDEX_VERSION:
+        return None
+    return index
+
+
+def load_index(root_dir=ROOT_DIR, jobs=1):
+    """Load the index, re-parsing only pages that changed since it was saved."""
+    index, changed = build_index(root_dir, read_index(root_dir), jobs)
+    if changed:
+        save_index(index, root_dir)
+    return index
+
+
+def is_fetched_page(rel_path):
+    """Check whether a page belongs to the archived fetched_pages copies."""
+    return 'fetched_pages' in rel_path.split('/')
+
+
+def iter_pages(index, include_fetched=True):
+    """Yield (rel_path, entry) for every indexed page in sorted order."""
+    for rel_path in sorted(index['pages']):
+        if include_fetched or not is_fetched_page(rel_path):
+            yield rel_path, index['pages'][rel_path]
+
+
+def iter_references(index, kinds=None, include_fetched=True):
+    """Yield (rel_path, ref) for every reference, optionally filtered by kind."""
+    for rel_path, entry in iter_pages(index, include_fetched):
+        for ref in entry['refs']:
+            if kinds is None or ref['kind'] in kinds:
+                yield rel_path, ref
+
+
+def pages_referencing(index, predicate, kinds=None, include_fetched=True):
+    """Return the sorted pages with at least one reference URL matching `predicate`."""
+    pages = []
+    for rel_path, entry in iter_pages(index, include_fetched):
+        for ref in entry['refs']:
+            if (kinds is None or ref['kind'] in kinds) and predicate(ref['url']):
+                pages.append(rel_path)
+                break
+    return pages
+
+
+def pages_containing(index, needles, root_dir=ROOT_DIR, include_fetched=True):
+    """Return the sorted pages whose raw content contains any of `needles`.
+
+    The fixers rewrite raw text (inline <style> and <script>, JSON-LD,
+    unindexed attributes), not just parsed references, so each page entry
+    records which raw needles it contains. A page is read only for needles
+    it has never been checked for; index_page re-checks the recorded
+    needles whenever the page's content changes. New results are saved
+    back to the index.
+    """
+    pages = []
+    updated = False
+    for rel_path, entry in iter_pages(index, include_fetched):
+        contains = entry.setdefault('contains', {})
+        unchecked = [needle for needle in needles if needle not in contains]
+        if unchecked:
+            try:
+                contains.update(scan_needles(Path(root_dir) / rel_path, unchecked))
+            except OSError:
+                continue
+            updated = True
+        if any(contains[needle] for needle in needles):
+            pages.append(rel_path)
+    if updated:
+        save_index(index, root_dir)
+    return pages
+
+
+def base_href(entry):
+    """Return the href of the page's first <base> element, or ''."""
+    for ref in entry['refs']:
+        if ref['element'] == 'base' and ref['attr'] == 'href':
+            return ref['url']
+    return ''
+
+
+def resolve_page(index, from_page, url_path, base=''):
+    """Map a link path found on from_page to the indexed page it opens, or None.
+
+    '' is the page itself; directory paths resolve to their index.html.
+    With `base` (the page's <base href>) relative paths, '' included, are
+    resolved against it the way a browser does.
+    """
+    if base and not url_path.startswith('/'):
+        url_path = urlsplit(urljoin(urljoin('/' + from_page, base), url_path)).path
+    if not url_path:
+        return from_page
+    if url_path.startswith('/'):
+        target = url_path.lstrip('/')
+    else:
+        target = posixpath.join(posixpath.dirname(from_page), url_path)
+    target = posixpath.normpath(target) if target else ''
+    if target in ('.', ''):
+        target = ''
+    candidates = [target] if target.endswith('.html') else [
+        posixpath.join(target, 'index.html') if target else 'index.html',
+        target + '.html',
+    ]
+    for candidate in candidates:
+        if candidate in index['pages']:
+            return candidate
+    return None
+
+
+def fragment_index(index):
+    """Map every indexed page to the set of fragment targets it defines."""
+    return {rel_path: set(entry['anchors']) for rel_path, entry in index['pages'].items()}
+
+
+def main():
+    print("=" * 80)
+    print("SITE INDEX")
+    print("=" * 80)
+
+    index, changed = build_index(ROOT_DIR, read_index(ROOT_DIR))
+    if changed:
+        save_index(index, ROOT_DIR)
+
+    counts = {}
+    for _, ref in iter_references(index):
+        counts[ref['kind']] = counts.get(ref['kind'], 0) + 1
+
+    print(f"\nIndexed {len(index['pages'])} HTML files -> {ROOT_DIR / INDEX_FILE}")
+    print(f"Index {'updated' if changed else 'already up to date'}")
+    print(f"\nReferences by kind:")
+    for kind in sorted(counts):
+        print(f"  - {kind}: {counts[kind]}")
+
+
+if __name__ == '__main__':
+    main()
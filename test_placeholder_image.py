@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+Round-trip tests for the placeholder encoders in placeholder_image.
+
+Every format is decoded back to pixels by Pillow and compared with the
+rendered rows; the stdlib PNG fallback is decoded the same way. The file
+headers are checked through image_headers.sniff, which also runs without
+Pillow.
+
+Usage:
+    python3 -m unittest test_placeholder_image
+"""
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+import image_headers
+import placeholder_image
+
+# (width, height, label): flat, tiny, odd sizes that are no multiple of 8, labelled
+CASES = [
+    (1, 1, None),
+    (17, 9, None),
+    (64, 40, 'Image'),
+    (123, 77, 'Cell Laboratory'),
+]
+JPEG_MAX_MEAN_ERROR = 12    # per channel value, whole image
+
+
+def expected_pixels(width, height, label):
+    colors = (placeholder_image.BACKGROUND, placeholder_image.FOREGROUND)
+    rows = placeholder_image.render_rows(width, height, label)
+    return b''.join(bytes(colors[index]) for row in rows for index in row)
+
+
+def decode(data):
+    """Decode data with Pillow; return (size, RGB bytes)."""
+    with Image.open(io.BytesIO(data)) as image:
+        image.load()
+        return image.size, image.convert('RGB').tobytes()
+
+
+class PlaceholderRoundTripTest(unittest.TestCase):
+
+    def encode(self, extension, width, height, label):
+        return placeholder_image.create_placeholder(f'placeholder{extension}', width, height, label)
+
+    def assert_sniffed(self, data, extension, width, height):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, f'placeholder{extension}')
+            with open(path, 'wb') as f:
+                f.write(data)
+            info = image_headers.sniff(path)
+        self.assertEqual(info.format, image_headers.EXTENSION_FORMATS[extension])
+        self.assertEqual((info.width, info.height), (width, height))
+
+    def test_png_fallback_headers(self):
+        with mock.patch.object(placeholder_image, 'Image', None):
+            for width, height, label in CASES:
+                with self.subTest(size=(width, height), label=label):
+                    self.assert_sniffed(self.encode('.png', width, height, label), '.png', width, height)
+
+    def test_fallback_needs_pillow_for_webp_and_jpeg(self):
+        with mock.patch.object(placeholder_image, 'Image', None):
+            for extension in ('.webp', '.jpg'):
+                with self.subTest(extension=extension), self.assertRaises(ValueError):
+                    self.encode(extension, 8, 8, None)
+
+    def test_unsupported_extension(self):
+        with self.assertRaises(ValueError):
+            placeholder_image.create_placeholder('placeholder.gif', 8, 8)
+
+    @unittest.skipIf(Image is None, 'Pillow is not installed')
+    def test_png_fallback_round_trip(self):
+        with mock.patch.object(placeholder_image, 'Image', None):
+            for width, height, label in CASES:
+                with self.subTest(size=(width, height), label=label):
+                    data = self.encode('.png', width, height, label)
+                    self.assertEqual(decode(data), ((width, height), expected_pixels(width, height, label)))
+
+    @unittest.skipIf(Image is None, 'Pillow is not installed')
+    def test_lossless_round_trip(self):
+        for extension in ('.png', '.webp'):
+            for width, height, label in CASES:
+                with self.subTest(extension=extension, size=(width, height), label=label):
+                    data = self.encode(extension, width, height, label)
+                    self.assert_sniffed(data, extension, width, height)
+                    self.assertEqual(decode(data), ((width, height), expected_pixels(width, height, label)))
+
+    @unittest.skipIf(Image is None, 'Pillow is not installed')
+    def test_jpeg_round_trip(self):
+        for extension in ('.jpg', '.jpeg'):
+            for width, height, label in CASES:
+                with self.subTest(extension=extension, size=(width, height), label=label):
+                    data = self.encode(extension, width, height, label)
+                    self.assert_sniffed(data, extension, width, height)
+                    size, pixels = decode(data)
+                    self.assertEqual(size, (width, height))
+                    expected = expected_pixels(width, height, label)
+                    errors = [abs(a - b) for a, b in zip(pixels, expected)]
+                    self.assertLessEqual(sum(errors) / len(errors), JPEG_MAX_MEAN_ERROR)
+
+
+if __name__ == '__main__':
+    unittest.main()
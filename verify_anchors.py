@@ -6,6 +6,9 @@ Update fetched pages to reference the corrected local pages with proper anchors
 import os
 import re
 from pathlib import Path
+from urllib.parse import unquote, urlparse
+
+import site_index
 
 def fix_fetched_pages_anchors():
     """Fix anchor references in fetched pages to point to local versions"""
@@ -59,37 +62,53 @@ def fix_fetched_pages_anchors():
     return 0
 
 
+def find_broken_fragments(index, include_fetched=False):
+    """Check every local #fragment link against the fragment index.
+
+    Relative links are resolved against the page's <base href> if it has one.
+
+    Returns (checked, broken) where broken lists (page, href, target_page, fragment).
+    target_page is None when the linked page itself is not in the site.
+    """
+    fragments = site_index.fragment_index(index)
+    bases = {rel_path: site_index.base_href(entry) for rel_path, entry in site_index.iter_pages(index)}
+    checked = 0
+    broken = []
+    
+    for rel_path, ref in site_index.iter_references(index, kinds={'anchor'}, include_fetched=include_fetched):
+        href = ref['url']
+        url_path, _, fragment = href.partition('#')
+        fragment = unquote(fragment)
+        # Skip external links, bare "#", "#top" and text fragments (#:~:text=)
+        if urlparse(href).scheme or href.startswith('//'):
+            continue
+        if not fragment or fragment == 'top' or fragment.startswith(':~:'):
+            continue
+        
+        checked += 1
+        target_page = site_index.resolve_page(index, rel_path, url_path.split('?')[0], bases[rel_path])
+        if target_page is None or fragment not in fragments[target_page]:
+            broken.append((rel_path, href, target_page, fragment))
+    
+    return checked, broken
+
+
 def verify_anchors_exist():
-    """Verify that all anchor IDs exist in their target pages"""
+    """Verify that every #fragment link in the site points at an existing id"""
     
     print("Verifying anchor IDs in target pages...\n")
     
-    anchors_to_check = {
-        "faq/index.html": ["faq-01", "faq-02", "faq-03", "faq-04", "faq-05", "faq-06"],
-        "flow/index.html": ["flow-01", "flow-02"],
-        "cell-laboratory/index.html": ["cgmp-cgtp"],
-    }
+    index = site_index.load_index(".")
+    checked, broken = find_broken_fragments(index)
     
-    all_ok = True
-    
-    for page_path, anchor_ids in anchors_to_check.items():
-        page = Path(page_path)
-        
-        if not page.exists():
-            print(f"  ✗ Page not found: {page_path}")
-            all_ok = False
-            continue
-        
-        content = page.read_text()
-        
-        for anchor_id in anchor_ids:
-            if f'id="{anchor_id}"' in content or f"id='{anchor_id}'" in content:
-                print(f"  ✓ {page_path}: #{anchor_id} exists")
-            else:
-                print(f"  ✗ {page_path}: #{anchor_id} NOT FOUND")
-                all_ok = False
+    for rel_path, href, target_page, fragment in broken:
+        if target_page is None:
+            print(f"  ✗ {rel_path}: {href} - page not found")
+        else:
+            print(f"  ✗ {rel_path}: {href} - #{fragment} NOT FOUND in {target_page}")
     
-    return all_ok
+    print(f"\n  Checked {checked} fragment links, {len(broken)} broken")
+    return not broken
 
 
 def main():